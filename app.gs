@@ -29,6 +29,19 @@ function doPost(e) {
       })).setMimeType(ContentService.MimeType.JSON);
     }
     
+    // Batch request: run every call and report a result for each one
+    if (Array.isArray(data.calls)) {
+      Logger.log("Received batch of " + data.calls.length + " calls");
+      const results = data.calls.map(function(call) {
+        return callFunction(call.function, call.parameters);
+      });
+      
+      return ContentService.createTextOutput(JSON.stringify({
+        success: true,
+        results: results
+      })).setMimeType(ContentService.MimeType.JSON);
+    }
+    
     // Call the requested function with the provided parameters
     Logger.log("Calling function: " + data.function);
     const result = this[data.function].apply(this, data.parameters);
@@ -48,6 +61,25 @@ function doPost(e) {
   }
 }
 
+// Function to run a single call of a batch request, isolating its errors
+function callFunction(functionName, parameters) {
+  try {
+    const fn = this[functionName];
+    if (typeof fn !== 'function') {
+      throw new Error("Unknown function: " + functionName);
+    }
+    Logger.log("Calling function: " + functionName);
+    const result = fn.apply(this, parameters || []);
+    if (result && result.success === false) {
+      return { success: false, error: result.error || "Unknown error" };
+    }
+    return { success: true, result: result };
+  } catch (error) {
+    Logger.log("Error in " + functionName + ": " + error.toString());
+    return { success: false, error: error.toString() };
+  }
+}
+
 // Function to send email with placeholder support
 function sendEmail(to, subject, htmlBody, senderName, placeholders) {
   // Basic validation
@@ -282,6 +314,55 @@ function sendTicketAssignmentNotification(technicianEmail, technicianName, ticke
   return sendEmail(technicianEmail, subject, htmlBody, "Asistencia Informática CRUB-UNCo", placeholders);
 }
 
+// Function to send one notification listing several tickets assigned at once
+function sendBulkAssignmentNotification(technicianEmail, technicianName, tickets) {
+  const subject = "Asistencia Informática CRUB-UNCo - " + tickets.length + " Tickets Asignados";
+  
+  const escapeHtml = function(text) {
+    return String(text || '').replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+  };
+  const ticketRows = tickets.map(function(ticket) {
+    return '<li><strong>#' + ticket.id + '</strong> (' + escapeHtml(ticket.priority) + '): ' +
+      escapeHtml(ticket.description) + '</li>';
+  }).join('');
+  
+  const htmlBody = `
+    <div class="email-container">
+      <div class="header">
+        <h1>Tickets Asignados</h1>
+      </div>
+      
+      <div class="content">
+        <p>Hola <<technicianName>>,</p>
+        <p>Se le han asignado <<ticketCount>> tickets de soporte técnico.</p>
+        
+        <div class="details">
+          <h3 style="margin-top: 0;">Tickets:</h3>
+          <ul><<ticketRows>></ul>
+        </div>
+        
+        <p style="text-align: center;">
+          <a href="https://huayca.crub.uncoma.edu.ar/asistencia-informatica/technician/dashboard" class="button">
+            Ver Panel de Control
+          </a>
+        </p>
+      </div>
+      
+      <div class="footer">
+        <p>Saludos cordiales,<br>Sistema de Asistencia Informática CRUB-UNCo</p>
+      </div>
+    </div>
+  `;
+  
+  const placeholders = {
+    technicianName: technicianName,
+    ticketCount: String(tickets.length),
+    ticketRows: ticketRows
+  };
+  
+  return sendEmail(technicianEmail, subject, htmlBody, "Asistencia Informática CRUB-UNCo", placeholders);
+}
+
 // Function to send notification when ticket status changes
 function sendTicketStatusUpdateNotification(userEmail, userName, ticketId, ticketDescription, status, technicianName, solution) {
   if (status === 'Closed') {
@@ -1,13 +1,28 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
-import logging
-import platform
-from logging.handlers import RotatingFileHandler
+import time
 
 db = SQLAlchemy()
 
 def create_app():
+    """
+    Build the application.
+
+    This runs once per worker, so it only wires configuration, logging,
+    extensions and blueprints: it does not touch the database or the
+    filesystem beyond creating the logs directory and opening the log file.
+    Schema creation, seeding and the instance directory are handled by
+    `flask init-db` and `flask seed-defaults` (see app/commands.py).
+    Whether the counter triggers exist is read on the first request that
+    needs the totals and cached.
+    """
+    started = time.perf_counter()
+    timings = []
+
+    def lap(phase):
+        timings.append((phase, time.perf_counter()))
+
     app = Flask(__name__)
     app.config.from_object('config.Config')
     
@@ -15,78 +30,48 @@ def create_app():
     if 'APPLICATION_ROOT' in os.environ:
         app.config['APPLICATION_ROOT'] = os.environ['APPLICATION_ROOT']
         app.config['PREFERRED_URL_SCHEME'] = 'https'
+    lap('config')
     
-    # Determine if we're on Windows or Linux for path handling
-    IS_WINDOWS = platform.system() == 'Windows'
-    
-    # Determine the correct base directory
-    if IS_WINDOWS:
-        # On Windows, use current directory's parent
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    else:
-        # On Linux, check for production path first
-        base_dir = '/var/www/asistencia-informatica'
-        if not os.path.exists(base_dir):
-            # Fallback to current directory's parent
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Configure logging with absolute paths
-    logs_dir = os.path.join(base_dir, 'logs')
-    if not os.path.exists(logs_dir):
-        try:
-            if IS_WINDOWS:
-                os.makedirs(logs_dir)
-            else:
-                os.makedirs(logs_dir, mode=0o775)
-        except:
-            app.logger.warning("Could not create logs directory, logging to console only")
-    
-    try:
-        file_handler = RotatingFileHandler(
-            os.path.join(logs_dir, 'helpdesk.log'), 
-            maxBytes=10240, 
-            backupCount=10
-        )
-        file_handler.setFormatter(logging.Formatter(
-            '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-        ))
-        file_handler.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)
-    except:
-        app.logger.warning("Could not configure file logging, logging to console only")
-        
-    app.logger.setLevel(logging.INFO)
-    app.logger.info('Helpdesk system startup')
-    
-    # Ensure instance path exists
-    instance_path = os.path.join(base_dir, 'instance')
-    if not os.path.exists(instance_path):
-        try:
-            if IS_WINDOWS:
-                os.makedirs(instance_path)
-            else:
-                os.makedirs(instance_path, mode=0o775)
-            app.logger.info(f"Created instance directory at {instance_path}")
-        except:
-            app.logger.warning(f"Could not create instance directory at {instance_path}")
+    from .utils.structured_logging import configure_logging
+    configure_logging(app)
+    lap('logging')
     
     db.init_app(app)
-
+    from .utils.sqlite_tuning import configure_sqlite
     with app.app_context():
-        from .routes.admin import admin_bp
-        from .routes.auth import auth_bp
-        from .routes.tickets import tickets_bp
-        
-        # Register blueprints
-        app.register_blueprint(admin_bp)
-        app.register_blueprint(auth_bp)
-        app.register_blueprint(tickets_bp)
+        configure_sqlite(app, db.engine)
+    # Alembic is only needed by the `flask db` commands; web workers skip importing it
+    if os.environ.get('FLASK_RUN_FROM_CLI'):
+        from flask_migrate import Migrate
+        Migrate(app, db, render_as_batch=True)
+    from .utils.metrics import init_metrics
+    init_metrics(app)
+    lap('extensions')
 
-        from .models import User, Technician, Ticket
-        db.create_all()
-        
-        # Create default user and technicians if they don't exist
-        create_defaults(app)
+    from .routes.admin import admin_bp
+    from .routes.auth import auth_bp
+    from .routes.tickets import tickets_bp
+    
+    # Register blueprints
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(tickets_bp)
+    lap('blueprints')
+
+    from .commands import register_commands
+    register_commands(app)
+    lap('commands')
+
+    # Startup timing report, one entry per phase in milliseconds
+    previous = started
+    report = {}
+    for phase, at in timings:
+        report[phase] = round((at - previous) * 1000, 1)
+        previous = at
+    report['total'] = round((previous - started) * 1000, 1)
+    app.extensions['startup_timing'] = report
+    app.logger.info(f"Helpdesk system startup in {report['total']} ms "
+                    f"({', '.join(f'{phase} {ms} ms' for phase, ms in report.items() if phase != 'total')})")
 
     return app
 
@@ -221,8 +206,8 @@ def create_defaults(app):
                 token
             )
             if email_result["success"]:
-                app.logger.info(f"Created technician and sent setup email: {tech['name']}")
+                app.logger.info(f"Created technician and queued setup email: {tech['name']}")
             else:
-                app.logger.warning(f"Created technician but failed to send setup email: {tech['name']}")
+                app.logger.warning(f"Created technician but failed to queue setup email: {tech['name']}")
     
     db.session.commit()
\ No newline at end of file
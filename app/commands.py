@@ -0,0 +1,286 @@
+import click
+from flask import current_app
+
+def register_commands(app):
+    """Register the helpdesk management commands on the Flask CLI."""
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create the instance and logs directories and any missing tables, indexes and triggers."""
+        import os
+        from app import db
+        from app import models  # noqa: F401 - registers every table on db.metadata
+        from app.utils.ticket_search import ensure_search_index
+        from app.utils.ticket_counters import ensure_ticket_counters
+        for name in ('instance', 'logs'):
+            path = os.path.join(app.config['BASE_DIR'], name)
+            if not os.path.isdir(path):
+                os.makedirs(path, mode=0o775, exist_ok=True)
+                click.echo(f"Directorio creado: {path}")
+        db.create_all()
+        ensure_search_index()
+        ensure_ticket_counters()
+        click.echo("Base de datos inicializada.")
+
+    @app.cli.command('seed-defaults')
+    def seed_defaults():
+        """Create the admin account, default categories and technicians if they are missing."""
+        from app import create_defaults
+        create_defaults(app)
+        click.echo("Datos iniciales verificados.")
+
+    @app.cli.command('email-worker')
+    @click.option('--once', is_flag=True, help='Procesar los correos pendientes y terminar.')
+    @click.option('--poll-interval', type=float, default=None, help='Segundos de espera cuando no hay correos pendientes.')
+    def email_worker(once, poll_interval):
+        """Deliver queued emails from the outbox."""
+        from app.utils.email_worker import EmailWorker
+        worker = EmailWorker()
+        try:
+            worker.run(poll_interval=poll_interval, once=once)
+        except KeyboardInterrupt:
+            current_app.logger.info("Email worker stopped")
+
+    @app.cli.command('email-retry-dead')
+    def email_retry_dead():
+        """Move dead-letter emails back to the outbox queue."""
+        from app.utils.email_worker import EmailWorker
+        revived = EmailWorker().retry_dead()
+        click.echo(f"{revived} correos devueltos a la cola.")
+
+    @app.cli.command('check-queries')
+    def check_queries():
+        """Fail if a dashboard or list view exceeds its SQL statement budget."""
+        from app.utils.query_checks import check_query_budgets
+        failures = check_query_budgets(app)
+        for failure in failures:
+            click.echo(failure, err=True)
+        if failures:
+            raise SystemExit(1)
+        click.echo("Todas las vistas están dentro de su presupuesto de consultas.")
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans():
+        """Fail if a view query does a full scan of a large table."""
+        from app.utils.query_checks import check_query_plans as run_checks
+        failures = run_checks(app)
+        for failure in failures:
+            click.echo(failure, err=True)
+        if failures:
+            raise SystemExit(1)
+        click.echo("Ninguna consulta de las vistas recorre tablas completas.")
+
+    @app.cli.command('rebuild-counters')
+    @click.option('--check', is_flag=True, help='Solo informar diferencias, sin modificar los contadores.')
+    def rebuild_counters(check):
+        """Recompute the ticket counters table and report any drift."""
+        from app.utils.ticket_counters import rebuild_counters as rebuild, COUNTER_KEY
+        drift = rebuild(dry_run=check)
+        for key, stored, actual in drift:
+            label = ', '.join(f'{column}={value}' for column, value in zip(COUNTER_KEY, key))
+            click.echo(f"Diferencia en ({label}): contador {stored}, real {actual}", err=True)
+        if check:
+            if drift:
+                raise SystemExit(1)
+            click.echo("Los contadores coinciden con la tabla de tickets.")
+        else:
+            click.echo(f"Contadores recalculados ({len(drift)} diferencias corregidas).")
+
+    @app.cli.command('simulate-assignment')
+    @click.option('--strategy', 'strategies', multiple=True, help='Estrategia a comparar (por defecto, todas).')
+    @click.option('--limit', type=int, default=None, help='Reproducir solo los N tickets más recientes.')
+    @click.option('--seed', type=int, default=0, help='Semilla para la estrategia aleatoria.')
+    def simulate_assignment(strategies, limit, seed):
+        """Replay past tickets through each assignment strategy and compare queue times."""
+        import random
+        from app.utils.assignment_simulation import load_history, simulate
+        from app.utils.registry import get_registry
+        from app.utils.ticket_distributor import STRATEGIES, parse_weights
+        history = load_history(limit)
+        if not history:
+            click.echo("No hay tickets para reproducir.")
+            return
+        technicians = get_registry().technicians_by_profile()
+        weights = parse_weights(app.config.get('ASSIGNMENT_WEIGHTS'))
+        click.echo(f"{len(history)} tickets; tiempos de espera en minutos.")
+        click.echo(f"{'Estrategia':<22}{'Tickets':>8}{'Media':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'Máx':>9}{'Cola máx':>10}")
+        for name in strategies or STRATEGIES:
+            if name not in STRATEGIES:
+                raise click.BadParameter(f"'{name}' no es una de {', '.join(STRATEGIES)}", param_hint='--strategy')
+            random.seed(seed)
+            result = simulate(name, technicians, history, weights)
+            minutes = [result[key] / 60 for key in ('mean', 'p50', 'p90', 'p99', 'max')]
+            click.echo(f"{name:<22}{result['tickets']:>8}" + ''.join(f"{value:>9.1f}" for value in minutes)
+                       + f"{result['max_backlog']:>10}")
+            if result['skipped']:
+                click.echo(f"  {result['skipped']} tickets sin técnicos para su perfil", err=True)
+
+    @app.cli.command('benchmark-bcrypt')
+    @click.option('--min-rounds', type=int, default=10, help='Menor costo a medir.')
+    @click.option('--max-rounds', type=int, default=14, help='Mayor costo a medir.')
+    def benchmark_bcrypt(min_rounds, max_rounds):
+        """Time password hashing at each bcrypt cost and show the costs of stored hashes."""
+        from collections import Counter
+        from app import db
+        from app.models.user import User
+        from app.models.technician import Technician
+        from app.utils.passwords import benchmark_rounds, bcrypt_rounds, hash_cost
+        configured = bcrypt_rounds()
+        click.echo(f"{'Costo':<8}{'ms por hash':>12}{'Logins/s por núcleo':>22}")
+        for rounds in range(min_rounds, max_rounds + 1):
+            seconds = benchmark_rounds(rounds)
+            marker = '  <- BCRYPT_ROUNDS' if rounds == configured else ''
+            click.echo(f"{rounds:<8}{seconds * 1000:>12.0f}{1 / seconds:>22.1f}{marker}")
+        stored = Counter(
+            hash_cost(password_hash)
+            for model in (User, Technician)
+            for password_hash, in db.session.query(model.password_hash).filter(model.password_hash.isnot(None))
+        )
+        for cost, count in sorted(stored.items(), key=lambda item: item[0] or 0):
+            click.echo(f"Contraseñas guardadas con costo {cost}: {count}")
+
+    @app.cli.command('seed-synthetic')
+    @click.option('--users', type=int, default=1000, help='Usuarios a crear.')
+    @click.option('--technicians', type=int, default=12, help='Técnicos a crear.')
+    @click.option('--categories', type=int, default=0, help='Categorías adicionales a crear.')
+    @click.option('--tickets', type=int, default=10000, help='Tickets a crear.')
+    @click.option('--days', type=int, default=365, help='Antigüedad máxima de los tickets, en días.')
+    @click.option('--seed', type=int, default=None, help='Semilla para generar siempre los mismos datos.')
+    def seed_synthetic(users, technicians, categories, tickets, days, seed):
+        """Bulk-insert synthetic users, technicians, categories and tickets for load tests."""
+        import time
+        from app.utils.synthetic_data import seed_synthetic as seed_data
+        started = time.perf_counter()
+        try:
+            inserted = seed_data(users, technicians, categories, tickets, days, seed)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        elapsed = time.perf_counter() - started
+        click.echo(', '.join(f"{count} {table}" for table, count in inserted.items()) + f" en {elapsed:.1f} s.")
+
+    @app.cli.command('sqlite-maintenance')
+    def sqlite_maintenance():
+        """Run PRAGMA optimize and checkpoint the WAL; meant for cron."""
+        from app import db
+        from app.utils.sqlite_tuning import run_maintenance
+        if db.engine.dialect.name != 'sqlite':
+            raise click.ClickException('La base de datos no es SQLite.')
+        result = run_maintenance(db.engine)
+        checkpoint = result['checkpoint']
+        if checkpoint is None:
+            click.echo(f"Estadísticas actualizadas (modo {result['journal_mode']}, sin WAL que volcar).")
+        else:
+            busy, wal_pages, done = checkpoint
+            click.echo(f"Estadísticas actualizadas; WAL: {done} de {wal_pages} páginas volcadas"
+                       f"{' (lectores activos impidieron truncarlo)' if busy else ''}, {result['seconds'] * 1000:.0f} ms.")
+
+    @app.cli.command('stress-sqlite')
+    @click.option('--profile', 'profiles', multiple=True, help='Perfil de SQLite a medir (por defecto, todos).')
+    @click.option('--writers', type=int, default=4, help='Procesos que crean tickets.')
+    @click.option('--readers', type=int, default=4, help='Procesos que listan tickets mientras tanto.')
+    @click.option('--writes', type=int, default=200, help='Tickets que crea cada proceso.')
+    @click.option('--tickets', type=int, default=5000, help='Tickets con los que empieza la base de prueba.')
+    def stress_sqlite(profiles, writers, readers, writes, tickets):
+        """Compare write throughput of the SQLite profiles under concurrent workers, on a temporary database."""
+        from app.utils.sqlite_tuning import SQLITE_PROFILES, stress_test
+        try:
+            report = stress_test(profiles or tuple(SQLITE_PROFILES), writers, readers, writes, tickets,
+                                 app.config['SQLITE_PRAGMAS'])
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{'Perfil':<14}{'escrituras/s':>14}{'p50 ms':>9}{'p95 ms':>9}{'lecturas/s':>12}{'bloqueos':>10}")
+        for profile, stats in report.items():
+            click.echo(f"{profile:<14}{stats['writes_per_second']:>14.1f}{stats['commit_p50_ms'] or 0:>9.1f}"
+                       f"{stats['commit_p95_ms'] or 0:>9.1f}{stats['reads_per_second']:>12.1f}{stats['locked_errors']:>10}")
+
+    @app.cli.command('fake-gas')
+    @click.option('--host', default='127.0.0.1', help='Dirección en la que escuchar.')
+    @click.option('--port', type=int, default=8765, help='Puerto en el que escuchar.')
+    @click.option('--token', default=None, help='Token esperado (por defecto, GOOGLE_DRIVE_SECURE_TOKEN).')
+    @click.option('--latency', type=float, default=0.0, help='Segundos que tarda cada solicitud.')
+    @click.option('--call-latency', type=float, default=0.0, help='Segundos adicionales por correo de un lote.')
+    @click.option('--jitter', type=float, default=0.0, help='Hasta cuántos segundos aleatorios sumar a cada solicitud.')
+    @click.option('--error-rate', type=float, default=0.0, help='Proporción de correos que fallan (0 a 1).')
+    @click.option('--quota-rate', type=float, default=0.0, help='Proporción de solicitudes respondidas con HTTP 429 (0 a 1).')
+    @click.option('--timeout-rate', type=float, default=0.0, help='Proporción de solicitudes que no responden a tiempo (0 a 1).')
+    @click.option('--timeout-seconds', type=float, default=None, help='Segundos que se retiene una solicitud que no responde a tiempo (por defecto, GAS_READ_TIMEOUT + 1).')
+    @click.option('--seed', type=int, default=None, help='Semilla para repetir los mismos fallos.')
+    def fake_gas(host, port, token, latency, call_latency, jitter, error_rate, quota_rate, timeout_rate,
+                 timeout_seconds, seed):
+        """Serve a local imitation of the Apps Script web app (app.gs) that records emails instead of sending them."""
+        from app.utils.fake_gas import FakeGasServer
+        token = token or app.config.get('GOOGLE_DRIVE_SECURE_TOKEN')
+        if not token:
+            raise click.ClickException('Indique --token o configure GOOGLE_DRIVE_SECURE_TOKEN.')
+        if timeout_seconds is None:
+            timeout_seconds = app.config.get('GAS_READ_TIMEOUT', 30) + 1
+        server = FakeGasServer(token, host, port, latency, call_latency, jitter, error_rate, quota_rate,
+                               timeout_rate, timeout_seconds, seed=seed)
+        click.echo(f"Apps Script simulado en {server.url}")
+        click.echo(f"Configure GAS_DEPLOYMENT_URL={server.url} en la aplicación. Ctrl+C para terminar.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+        click.echo(', '.join(f"{key} {count}" for key, count in sorted(server.stats.items())) or 'Sin solicitudes.')
+
+    @app.cli.command('benchmark')
+    @click.option('--mode', type=click.Choice(['client', 'server', 'all']), default='all',
+                  help='client: cliente de pruebas de Flask; server: servidor WSGI local con varios procesos.')
+    @click.option('--scenario', 'scenarios', multiple=True, help='Escenario a medir (por defecto, todos).')
+    @click.option('--requests', 'requests_per_scenario', type=int, default=200, help='Solicitudes por escenario.')
+    @click.option('--workers', type=int, default=4, help='Procesos del servidor local.')
+    @click.option('--concurrency', type=int, default=8, help='Clientes simultáneos contra el servidor local.')
+    @click.option('--save', 'save_path', type=click.Path(dir_okay=False), help='Guardar los resultados como línea base JSON.')
+    @click.option('--compare', 'compare_path', type=click.Path(exists=True, dir_okay=False), help='Línea base JSON con la cual comparar.')
+    @click.option('--threshold', type=float, default=20.0, help='Porcentaje de empeoramiento tolerado al comparar.')
+    @click.option('--fake-gas', is_flag=True, help='Enviar los correos, sin la cola, a un Apps Script simulado local.')
+    @click.option('--gas-latency', type=float, default=0.0, help='Segundos que tarda cada llamada al Apps Script simulado.')
+    @click.option('--gas-error-rate', type=float, default=0.0, help='Proporción de correos que fallan (0 a 1).')
+    @click.option('--gas-quota-rate', type=float, default=0.0, help='Proporción de llamadas respondidas con HTTP 429 (0 a 1).')
+    @click.option('--gas-timeout-rate', type=float, default=0.0, help='Proporción de llamadas que no responden a tiempo (0 a 1).')
+    def benchmark(mode, scenarios, requests_per_scenario, workers, concurrency, save_path, compare_path, threshold,
+                  fake_gas, gas_latency, gas_error_rate, gas_quota_rate, gas_timeout_rate):
+        """Measure latency, throughput and queries per request of the main views. Writes to the database."""
+        from app.utils.benchmark import SCENARIOS, run_benchmark, compare, save_report, load_report
+        names = [scenario.name for scenario in SCENARIOS]
+        for name in scenarios:
+            if name not in names:
+                raise click.BadParameter(f"'{name}' no es uno de {', '.join(names)}", param_hint='--scenario')
+        modes = ('client', 'server') if mode == 'all' else (mode,)
+        gas_settings = None
+        if fake_gas:
+            gas_settings = {
+                'latency': gas_latency, 'error_rate': gas_error_rate, 'quota_rate': gas_quota_rate,
+                'timeout_rate': gas_timeout_rate,
+                'timeout_seconds': app.config.get('GAS_READ_TIMEOUT', 30) + 1,
+            }
+        try:
+            report = run_benchmark(app, modes, scenarios, requests_per_scenario, workers, concurrency, gas_settings)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(f"Tablas: {', '.join(f'{table} {count}' for table, count in report['tables'].items())}")
+        if 'fake_gas' in report:
+            click.echo(f"Apps Script simulado: {', '.join(f'{key} {count}' for key, count in sorted(report['fake_gas'].items()))}")
+        for run_mode, results in report['results'].items():
+            click.echo(f"\n{run_mode}")
+            click.echo(f"{'Escenario':<30}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'SQL/req':>9}{'Errores':>9}")
+            for name, stats in results.items():
+                queries = stats['queries_per_request']
+                click.echo(f"{name:<30}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+                           f"{stats['throughput_rps']:>9.1f}{'-' if queries is None else f'{queries:.1f}':>9}{stats['errors']:>9}")
+
+        if save_path:
+            save_report(report, save_path)
+            click.echo(f"\nResultados guardados en {save_path}")
+        if compare_path:
+            rows, regressions = compare(report, load_report(compare_path), threshold)
+            click.echo(f"\nComparación con {compare_path}")
+            for run_mode, name, metric, before, after, change in rows:
+                marker = '  <- empeoró' if (run_mode, name, metric, before, after, change) in regressions else ''
+                click.echo(f"{run_mode:<8}{name:<30}{metric:<21}{before:>10.1f}{after:>10.1f}{change:>+9.1f}%{marker}")
+            if regressions:
+                raise click.ClickException(f"{len(regressions)} métricas empeoraron más de {threshold:g}%.")
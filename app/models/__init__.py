@@ -1,4 +1,6 @@
 from .ticket import Ticket
 from .technician import Technician
 from .user import User
-from .category import TicketCategory
\ No newline at end of file
+from .category import TicketCategory
+from .email_outbox import EmailOutbox
+from .ticket_counter import TicketCounter
@@ -0,0 +1,34 @@
+from app import db
+from datetime import datetime
+import json
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # Worker query: due messages in a given status
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+
+    id = db.Column(db.Integer, primary_key=True)
+    function_name = db.Column(db.String(100), nullable=False)  # GAS function to call
+    parameters = db.Column(db.Text, nullable=False)  # JSON encoded list of parameters
+    status = db.Column(db.String(20), default=STATUS_PENDING, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id}: {self.function_name} - {self.status}>'
+
+    def get_parameters(self):
+        return json.loads(self.parameters)
+
+    def set_parameters(self, parameters):
+        self.parameters = json.dumps(parameters)
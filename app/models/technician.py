@@ -1,7 +1,7 @@
 from app import db
-import bcrypt
 from datetime import datetime, timedelta
 import secrets
+from app.utils.passwords import hash_password, verify_password
 
 class Technician(db.Model):
     __tablename__ = 'technicians'
@@ -14,19 +14,24 @@ class Technician(db.Model):
     password_hash = db.Column(db.String(128))
     password_reset_token = db.Column(db.String(100), unique=True)
     token_expiration = db.Column(db.DateTime)
-    tickets = db.relationship('Ticket', backref='technician', lazy=True)
+    active = db.Column(db.Boolean, default=True, nullable=False)  # Inactive technicians get no tickets and cannot log in
+    # Tickets are detached with set-based UPDATEs before a technician is deleted
+    # (see release_technician_tickets), so deleting must not load them
+    tickets = db.relationship('Ticket', backref='technician', lazy=True, passive_deletes=True)
 
     def __repr__(self):
         return f'<Technician {self.name} - {self.technical_profile}>'
         
     def set_password(self, password):
         if password:
-            self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        if self.password_hash and password:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
-        return False
+        """Check the password, rehashing it if the configured work factor changed (the caller commits)."""
+        valid, needs_rehash = verify_password(self.password_hash, password)
+        if needs_rehash:
+            self.set_password(password)
+        return valid
 
     def generate_password_token(self):
         self.password_reset_token = secrets.token_urlsafe(32)
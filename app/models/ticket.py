@@ -3,6 +3,16 @@ from datetime import datetime
 
 class Ticket(db.Model):
     __tablename__ = 'tickets'
+    __table_args__ = (
+        # Technician dashboard sections: filter by (technician, status), sort by date
+        db.Index('ix_tickets_technician_status_created', 'technician_id', 'status', 'created_at'),
+        db.Index('ix_tickets_technician_status_updated', 'technician_id', 'status', 'updated_at'),
+        # "Mis Tickets" list for regular users
+        db.Index('ix_tickets_user_created', 'user_id', 'created_at'),
+        # Admin dashboard: status counts and status filter sorted by date
+        db.Index('ix_tickets_status_created', 'status', 'created_at'),
+        db.Index('ix_tickets_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(255), nullable=False)
@@ -13,8 +23,8 @@ class Ticket(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('ticket_categories.id'), nullable=False)
     profile = db.Column(db.String(50), nullable=True)  # Derived from category
     solution = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     def __repr__(self):
         return f'<Ticket {self.id}: {self.description} - {self.status}>'
\ No newline at end of file
@@ -0,0 +1,27 @@
+from app import db
+
+class TicketCounter(db.Model):
+    """
+    Number of tickets per (status, technician, category, profile).
+
+    Rows are maintained by database triggers on the tickets table (see
+    app/utils/ticket_counters.py), so they change in the same transaction as
+    the tickets themselves. Key columns may be NULL; the triggers match keys
+    with IS, so each key, NULLs included, has a single row. A unique index
+    could not enforce that, as it treats NULLs as distinct. Totals over
+    several keys are read with SUM(count).
+    """
+    __tablename__ = 'ticket_counters'
+    __table_args__ = (
+        db.Index('ix_ticket_counters_key', 'status', 'technician_id', 'category_id', 'profile'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(50), nullable=True)
+    technician_id = db.Column(db.Integer, nullable=True)
+    category_id = db.Column(db.Integer, nullable=True)
+    profile = db.Column(db.String(50), nullable=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<TicketCounter {self.status}/{self.technician_id}/{self.category_id}/{self.profile}: {self.count}>'
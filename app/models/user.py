@@ -1,7 +1,7 @@
 from app import db
-import bcrypt
 from datetime import datetime, timedelta
 import secrets
+from app.utils.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -11,7 +11,7 @@ class User(db.Model):
     apellido = db.Column(db.String(100), nullable=False)
     nombre = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    departamento = db.Column(db.String(100), nullable=True)  # New field
+    departamento = db.Column(db.String(100), nullable=True, index=True)  # New field
     role = db.Column(db.String(50), nullable=False)  # 'user' or 'admin'
     password_hash = db.Column(db.String(128))  # Only required for admin users
     password_reset_token = db.Column(db.String(100), unique=True)
@@ -23,12 +23,14 @@ class User(db.Model):
     
     def set_password(self, password):
         if password:
-            self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        if self.password_hash and password:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
-        return False
+        """Check the password, rehashing it if the configured work factor changed (the caller commits)."""
+        valid, needs_rehash = verify_password(self.password_hash, password)
+        if needs_rehash:
+            self.set_password(password)
+        return valid
 
     def generate_password_token(self):
         self.password_reset_token = secrets.token_urlsafe(32)
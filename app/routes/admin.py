@@ -1,10 +1,20 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash, session, current_app
+from flask import Blueprint, render_template, redirect, url_for, request, flash, session, current_app, Response, stream_with_context
+import hmac
+from datetime import datetime
 from functools import wraps
+from sqlalchemy.orm import joinedload
 from app.models.technician import Technician
 from app.models.ticket import Ticket
 from app.models.category import TicketCategory
-from app.models.user import User
 from app.utils.email_service import EmailService
+from app.utils.ticket_filters import get_ticket_filters, apply_ticket_filters
+from app.utils.keyset import keyset_paginate
+from app.utils.ticket_counters import status_totals
+from app.utils.registry import get_registry
+from app.utils.metrics import get_metrics
+from app.utils.ticket_export import export_rows, iter_csv, iter_ndjson
+from app.utils.bulk_operations import bulk_update_tickets, release_technician_tickets
+from app.utils.transactions import retry_on_busy, is_database_busy
 from app import db
 
 admin_bp = Blueprint('admin', __name__)
@@ -21,37 +31,133 @@ def admin_required(f):
 @admin_bp.route('/admin/dashboard')
 @admin_required
 def dashboard():
-    # Get pagination parameters
-    page = request.args.get('page', 1, type=int)
     per_page = 15  # Number of tickets per page in admin dashboard
     
-    # Calculate statistics for the dashboard
-    total_tickets = Ticket.query.count()
-    open_tickets = Ticket.query.filter_by(status='Abierto').count()
-    closed_tickets = Ticket.query.filter_by(status='Cerrado').count()
+    # Calculate statistics for the dashboard, from the counters table when available
+    totals = status_totals()
+    if totals is not None:
+        total_tickets = sum(totals.values())
+        open_tickets = totals.get('Abierto', 0)
+        closed_tickets = totals.get('Cerrado', 0)
+    else:
+        total_tickets = Ticket.query.count()
+        open_tickets = Ticket.query.filter_by(status='Abierto').count()
+        closed_tickets = Ticket.query.filter_by(status='Cerrado').count()
     
-    # Get all tickets for the table, paginated and ordered by created_at desc
-    pagination = Ticket.query.order_by(Ticket.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False)
+    # Get all tickets for the table, newest first, one cursor page at a time
+    # Filters from the dashboard controls are applied in SQL so that
+    # pagination and result counts cover every matching ticket
+    filters = get_ticket_filters(request.args)
+    
+    # User and technician are rendered on every row, so load them in the same query
+    query = apply_ticket_filters(Ticket.query.options(
+        joinedload(Ticket.user),
+        joinedload(Ticket.technician)
+    ), filters)
+    
+    # Unfiltered, the total is the statistic above; filtered, counting is opt-in
+    if not filters:
+        total = total_tickets
+    elif current_app.config.get('PAGINATION_EXACT_TOTALS'):
+        total = query.order_by(None).count()
+    else:
+        total = None
+    pagination = keyset_paginate(query, Ticket.created_at, Ticket.id, per_page,
+                                 after=request.args.get('after'),
+                                 before=request.args.get('before'),
+                                 total=total)
     
     tickets = pagination.items
     
-    # Get unique departments and technicians for filters
-    departments = db.session.query(User.departamento).distinct().all()
-    departments = [dept[0] for dept in departments if dept[0]]
-    technicians = Technician.query.all()
+    # Departments and technicians for the filters, from the registry instead of a query per render
+    registry = get_registry()
+    departments = registry.departments()
+    technicians = registry.technicians()
     
     return render_template('admin/dashboard.html', 
+                          route_metrics=get_metrics().summary(),
                           total_tickets=total_tickets, 
                           open_tickets=open_tickets,
                           closed_tickets=closed_tickets,
                           tickets=tickets,
                           pagination=pagination,
                           departments=departments,
-                          technicians=technicians)
+                          technicians=technicians,
+                          filters=filters)
+
+@admin_bp.route('/admin/metrics')
+def metrics():
+    """Request metrics of this worker in the Prometheus text format."""
+    token = current_app.config.get('METRICS_TOKEN')
+    authorization = request.headers.get('Authorization', '')
+    scraper = token and hmac.compare_digest(authorization, f'Bearer {token}')
+    if not scraper and (not session.get('user_id') or session.get('user_role') != 'admin'):
+        flash('Se requiere acceso de administrador.', 'danger')
+        return redirect(url_for('auth.login'))
+    return Response(get_metrics().prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@admin_bp.route('/admin/export')
+@admin_required
+def export_tickets():
+    """Stream every ticket matching the dashboard filters as CSV or NDJSON."""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        flash('Formato de exportación inválido.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+    
+    filters = get_ticket_filters(request.args)
+    rows = export_rows(filters)
+    if export_format == 'csv':
+        body, content_type = iter_csv(rows), 'text/csv; charset=utf-8'
+    else:
+        body, content_type = iter_ndjson(rows), 'application/x-ndjson; charset=utf-8'
+    
+    # The generator keeps the request context, and with it the database
+    # session, open while the rows are being sent
+    filename = f"tickets_{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+    current_app.logger.info(f"Ticket export started: format={export_format}, filters={filters}")
+    return Response(stream_with_context(body), content_type=content_type,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@admin_bp.route('/admin/tickets/bulk', methods=['POST'])
+@admin_required
+@retry_on_busy
+def bulk_update():
+    """Change the status, priority or technician of many tickets at once."""
+    action = request.form.get('action')
+    # The new value has its own field per action; the plain names carry the dashboard filters
+    value_field = {'status': 'new_status', 'priority': 'new_priority', 'reassign': 'new_technician_id'}.get(action, '')
+    value = request.form.get(value_field, '')
+    filters = get_ticket_filters(request.form)
+    
+    # Either the tickets ticked on the page, or every ticket matching the filters
+    ticket_ids = []
+    if request.form.get('scope') != 'filtered':
+        ticket_ids = [int(ticket_id) for ticket_id in request.form.getlist('ticket_ids') if ticket_id.isdigit()]
+        if not ticket_ids:
+            flash('Seleccione al menos un ticket.', 'danger')
+            return redirect(url_for('admin.dashboard', **filters))
+    
+    try:
+        result = bulk_update_tickets(action, value, ticket_ids=ticket_ids, filters=filters,
+                                     solution=request.form.get('solution'))
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin.dashboard', **filters))
+    except Exception as e:
+        if is_database_busy(e):
+            raise
+        db.session.rollback()
+        current_app.logger.error(f"Error in bulk ticket update: {str(e)}")
+        flash('Error al actualizar los tickets.', 'danger')
+        return redirect(url_for('admin.dashboard', **filters))
+    
+    flash(f"{result['updated']} tickets actualizados.", 'success')
+    return redirect(url_for('admin.dashboard', **filters))
 
 @admin_bp.route('/admin/manage_technicians', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def manage_technicians():
     if request.method == 'POST':
         dni = request.form.get('dni')
@@ -83,28 +189,27 @@ def manage_technicians():
             )
             token = new_technician.generate_password_token()
             db.session.add(new_technician)
-            db.session.commit()
             
-            # Send password setup email
-            current_app.logger.info(f"Technician created successfully: {email}")
+            # Queue password setup email; it is saved in the same commit as the technician
             email_service = EmailService()
             email_result = email_service.send_password_setup_email(
                 new_technician.email,
                 new_technician.name,
                 token
             )
+            db.session.commit()
+            get_registry().invalidate()
+            current_app.logger.info(f"Technician created successfully: {email}")
             
             if email_result["success"]:
                 flash('¡Técnico agregado exitosamente! Recibirá un correo para configurar su contraseña.', 'success')
-                current_app.logger.info(f"Password setup email sent to technician: {email}")
             else:
                 current_app.logger.error(f"Failed to send password setup email to technician: {email_result['message']}")
-                db.session.delete(new_technician)
-                db.session.commit()
-                flash('Error al agregar técnico: No se pudo enviar el correo de configuración.', 'danger')
-                return render_template('admin/manage_technicians.html')
+                flash('Técnico agregado, pero no se pudo enviar el correo de configuración.', 'warning')
                 
         except Exception as e:
+            if is_database_busy(e):
+                raise
             current_app.logger.error(f"Error creating technician: {str(e)}")
             flash('Error al agregar técnico debido a un error del sistema.', 'danger')
             return render_template('admin/manage_technicians.html')
@@ -115,6 +220,7 @@ def manage_technicians():
 
 @admin_bp.route('/admin/edit_technician/<int:technician_id>', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def edit_technician(technician_id):
     technician = Technician.query.get_or_404(technician_id)
     
@@ -145,25 +251,75 @@ def edit_technician(technician_id):
             technician.email = email
             technician.technical_profile = profile
             db.session.commit()
+            get_registry().invalidate()
             flash('¡Técnico actualizado exitosamente!', 'success')
             return redirect(url_for('admin.manage_technicians'))
         except Exception as e:
+            if is_database_busy(e):
+                raise
             current_app.logger.error(f"Error updating technician: {str(e)}")
             flash('Error al actualizar técnico.', 'danger')
     
     return render_template('admin/edit_technician.html', technician=technician)
 
-@admin_bp.route('/admin/delete_technician/<int:technician_id>')
+@admin_bp.route('/admin/delete_technician/<int:technician_id>', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def delete_technician(technician_id):
     technician = Technician.query.get_or_404(technician_id)
-    db.session.delete(technician)
-    db.session.commit()
-    flash('¡Técnico eliminado exitosamente!', 'success')
+    reassign = request.values.get('open_tickets', 'reassign') != 'unassign'
+    try:
+        technician.active = False
+        db.session.flush()
+        result = release_technician_tickets(technician, reassign=reassign, detach_closed=True)
+        db.session.delete(technician)
+        db.session.commit()
+    except Exception as e:
+        if is_database_busy(e):
+            raise
+        db.session.rollback()
+        current_app.logger.error(f"Error deleting technician: {str(e)}")
+        flash('Error al eliminar el técnico.', 'danger')
+        return redirect(url_for('admin.manage_technicians'))
+    finally:
+        get_registry().invalidate()
+    flash(f"¡Técnico eliminado exitosamente! Tickets abiertos reasignados: {result['reassigned']}, "
+          f"sin asignar: {result['unassigned']}.", 'success')
+    return redirect(url_for('admin.manage_technicians'))
+
+@admin_bp.route('/admin/technicians/<int:technician_id>/toggle', methods=['POST'])
+@admin_required
+@retry_on_busy
+def toggle_technician(technician_id):
+    technician = Technician.query.get_or_404(technician_id)
+    result = None
+    try:
+        technician.active = not technician.active
+        db.session.flush()
+        if not technician.active:
+            # A deactivated technician keeps their closed tickets but not the open ones
+            reassign = request.form.get('open_tickets', 'reassign') != 'unassign'
+            result = release_technician_tickets(technician, reassign=reassign)
+        db.session.commit()
+    except Exception as e:
+        if is_database_busy(e):
+            raise
+        db.session.rollback()
+        current_app.logger.error(f"Error toggling technician: {str(e)}")
+        flash('Error al actualizar el técnico.', 'danger')
+        return redirect(url_for('admin.manage_technicians'))
+    finally:
+        get_registry().invalidate()
+    if result:
+        flash(f"¡Técnico desactivado exitosamente! Tickets abiertos reasignados: {result['reassigned']}, "
+              f"sin asignar: {result['unassigned']}.", 'success')
+    else:
+        flash('¡Técnico activado exitosamente!', 'success')
     return redirect(url_for('admin.manage_technicians'))
 
 @admin_bp.route('/admin/categories', methods=['GET', 'POST'])
 @admin_required
+@retry_on_busy
 def manage_categories():
     if request.method == 'POST':
         name = request.form.get('name')
@@ -197,8 +353,11 @@ def manage_categories():
                 flash('¡Categoría agregada exitosamente!', 'success')
                 
             db.session.commit()
+            get_registry().invalidate()
             
         except Exception as e:
+            if is_database_busy(e):
+                raise
             current_app.logger.error(f"Error managing category: {str(e)}")
             flash('Error al guardar la categoría.', 'danger')
             
@@ -216,10 +375,12 @@ def edit_category(category_id):
 
 @admin_bp.route('/admin/categories/<int:category_id>/toggle', methods=['POST'])
 @admin_required
+@retry_on_busy
 def toggle_category(category_id):
     category = TicketCategory.query.get_or_404(category_id)
     category.active = not category.active
     db.session.commit()
+    get_registry().invalidate()
     status = "activada" if category.active else "desactivada"
     flash(f'¡Categoría {status} exitosamente!', 'success')
     return redirect(url_for('admin.manage_categories'))
\ No newline at end of file
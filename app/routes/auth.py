@@ -1,12 +1,18 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session, current_app
+from sqlalchemy.exc import OperationalError
 from app.models.user import User
 from app.models.technician import Technician
 from app.utils.email_service import EmailService
+from app.utils.accounts import find_login_account, store_password_hash
+from app.utils.passwords import hash_password, verify_password
+from app.utils.transactions import retry_on_busy, is_database_busy
+from app.utils.registry import get_registry
 from app import db
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
+@retry_on_busy
 def register():
     if request.method == 'POST':
         dni = request.form.get('dni')
@@ -41,28 +47,28 @@ def register():
             )
             token = new_user.generate_password_token()
             db.session.add(new_user)
-            db.session.commit()
             
-            # Send password setup email
-            current_app.logger.info(f"User registered successfully: {email}")
+            # Queue password setup email; it is saved in the same commit as the user
             email_service = EmailService()
             email_result = email_service.send_password_setup_email(
                 new_user.email,
                 new_user.nombre,  # Using nombre instead of name
                 token
             )
+            db.session.commit()
+            get_registry().add_department(departamento)
+            current_app.logger.info(f"User registered successfully: {email}")
             
             if email_result["success"]:
                 flash('¡Registro exitoso! Por favor, revise su correo electrónico para configurar su contraseña.', 'success')
-                current_app.logger.info(f"Password setup email sent successfully to {email}")
             else:
+                # The account exists; the user can request a new link from "forgot password"
                 current_app.logger.error(f"Failed to send password setup email: {email_result['message']}")
-                db.session.delete(new_user)
-                db.session.commit()
-                flash('Registro fallido: No se pudo enviar el correo de configuración. Por favor, intente nuevamente o contacte a soporte.', 'danger')
-                return render_template('auth/register.html')
+                flash('Registro exitoso, pero no se pudo enviar el correo de configuración. Use "Olvidé mi contraseña" para recibir un nuevo enlace.', 'warning')
                 
         except Exception as e:
+            if is_database_busy(e):
+                raise
             current_app.logger.error(f"Error during registration: {str(e)}")
             flash('El registro falló debido a un error del sistema. Por favor intente más tarde.', 'danger')
             return render_template('auth/register.html')
@@ -72,6 +78,7 @@ def register():
     return render_template('auth/register.html')
 
 @auth_bp.route('/set-password/<token>', methods=['GET', 'POST'])
+@retry_on_busy
 def set_password(token):
     if not token:
         flash('Enlace de configuración de contraseña inválido.', 'danger')
@@ -115,63 +122,58 @@ def login():
         dni = request.form.get('dni')
         password = request.form.get('password')
         
-        # Check for admin login
-        if dni == 'admin':
-            # Get admin user
-            admin = User.query.filter_by(role='admin').first()
-            if not admin:
+        # Admin, technician and user accounts are looked up with one query
+        account = find_login_account(dni)
+        if not account:
+            if dni == 'admin':
                 flash('¡Cuenta de administrador no encontrada!', 'danger')
-                return render_template('auth/login.html')
-                
-            if not password or not admin.check_password(password):
+            else:
+                flash('¡Usuario no encontrado!', 'danger')
+            return render_template('auth/login.html')
+
+        if account.kind != 'admin' and not account.password_hash:
+            flash('Por favor configure su contraseña primero. Revise su correo electrónico para instrucciones.', 'warning')
+            return render_template('auth/login.html')
+
+        valid, needs_rehash = verify_password(account.password_hash, password)
+        if not valid:
+            if account.kind == 'admin':
                 flash('¡Credenciales de administrador inválidas!', 'danger')
-                return render_template('auth/login.html')
-            
-            session['user_id'] = admin.id
-            session['user_name'] = f"{admin.nombre} {admin.apellido}"
-            session['user_role'] = 'admin'
-            
+            else:
+                flash('¡Credenciales inválidas!', 'danger')
+            return render_template('auth/login.html')
+
+        if not account.active:
+            flash('Su cuenta de técnico está desactivada. Contacte al administrador.', 'danger')
+            return render_template('auth/login.html')
+
+        # Hashes made with an older work factor are upgraded while the password is at hand
+        if needs_rehash:
+            store_password_hash(account, hash_password(password))
+            try:
+                db.session.commit()
+            except OperationalError as e:
+                # The upgrade can wait for the next login; the login itself should not fail
+                if not is_database_busy(e):
+                    raise
+                db.session.rollback()
+                current_app.logger.warning("Password rehash skipped: database locked")
+
+        session['user_id'] = account.id
+        session['user_name'] = account.name
+        session['user_role'] = account.kind
+
+        if account.kind == 'admin':
             flash('¡Inicio de sesión de administrador exitoso!', 'success')
             return redirect(url_for('admin.dashboard'))
-        
-        # Check for technician login with DNI
-        technician = Technician.query.filter_by(dni=dni).first()
-        if technician:
-            if not technician.password_hash:
-                flash('Por favor configure su contraseña primero. Revise su correo electrónico para instrucciones.', 'warning')
-                return render_template('auth/login.html')
-                
-            if not password or not technician.check_password(password):
-                flash('¡Credenciales inválidas!', 'danger')
-                return render_template('auth/login.html')
-            
-            session['user_id'] = technician.id
-            session['user_name'] = technician.name
-            session['user_role'] = 'technician'
-            session['technical_profile'] = technician.technical_profile
-            
-            flash('¡Inicio de sesión exitoso!', 'success')
-            return redirect(url_for('tickets.technician_dashboard'))  # Changed this line
-        
-        # Check for regular user login with DNI
-        user = User.query.filter_by(dni=dni).first()
-        if user:
-            if not user.password_hash:
-                flash('Por favor configure su contraseña primero. Revise su correo electrónico para instrucciones.', 'warning')
-                return render_template('auth/login.html')
-                
-            if not password or not user.check_password(password):
-                flash('¡Credenciales inválidas!', 'danger')
-                return render_template('auth/login.html')
-            
-            session['user_id'] = user.id
-            session['user_name'] = f"{user.nombre} {user.apellido}"
-            session['user_role'] = 'user'
-            
+
+        if account.kind == 'technician':
+            session['technical_profile'] = account.profile
             flash('¡Inicio de sesión exitoso!', 'success')
-            return redirect(url_for('tickets.list'))
-        
-        flash('¡Usuario no encontrado!', 'danger')
+            return redirect(url_for('tickets.technician_dashboard'))
+
+        flash('¡Inicio de sesión exitoso!', 'success')
+        return redirect(url_for('tickets.list'))
             
     return render_template('auth/login.html')
 
@@ -182,6 +184,7 @@ def logout():
     return redirect(url_for('auth.login'))
 
 @auth_bp.route('/forgot-password', methods=['GET', 'POST'])
+@retry_on_busy
 def forgot_password():
     if request.method == 'POST':
         dni = request.form.get('dni')
@@ -201,9 +204,8 @@ def forgot_password():
             
         # Generate password reset token
         token = account.generate_password_token()
-        db.session.commit()
         
-        # Send password reset email
+        # Queue password reset email together with the new token
         email_service = EmailService()
         name = f"{account.nombre} {account.apellido}" if isinstance(account, User) else account.name
         email_result = email_service.send_password_setup_email(
@@ -211,6 +213,7 @@ def forgot_password():
             name,
             token
         )
+        db.session.commit()
         
         if email_result["success"]:
             flash('Se ha enviado un enlace de recuperación a su correo electrónico.', 'success')
@@ -1,16 +1,28 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, session, current_app
+from flask import Blueprint, request, render_template, redirect, url_for, flash, session, current_app, jsonify
 from functools import wraps
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
 from app.models.ticket import Ticket
 from app.models.user import User
-from app.models.technician import Technician
-from app.models.category import TicketCategory
-from app.utils.ticket_distributor import TicketDistributor
+from app.utils.registry import get_registry, OPEN_STATUSES
 from app.utils.email_service import EmailService
+from app.utils.ticket_filters import get_ticket_filters, apply_ticket_filters
+from app.utils.ticket_search import search_tickets
+from app.utils.keyset import keyset_paginate
+from app.utils.transactions import retry_on_busy, after_rollback
+from app.utils.conditional_get import page_etag, render_conditional
 from app import db
 from datetime import datetime
 
 tickets_bp = Blueprint('tickets', __name__)
 
+# Technician dashboard sections: ticket status and the column they are sorted by
+TECHNICIAN_SECTIONS = {
+    'open': ('Abierto', Ticket.created_at),
+    'in_progress': ('En Proceso', Ticket.created_at),
+    'closed': ('Cerrado', Ticket.updated_at),
+}
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -27,6 +39,7 @@ def home():
 
 @tickets_bp.route('/tickets/create', methods=['GET', 'POST'])
 @login_required
+@retry_on_busy
 def create():
     if request.method == 'POST':
         description = request.form['description']
@@ -34,10 +47,11 @@ def create():
         user_id = session['user_id']
         user = User.query.get(user_id)
         email_service = EmailService()  # Initialize EmailService here
+        registry = get_registry()
         
         # Get category and its technical profile
-        category = TicketCategory.query.get(category_id)
-        if not category or not category.active:
+        category = registry.category(category_id)
+        if not category or not category['active']:
             flash('Categoría seleccionada inválida o inactiva.', 'danger')
             return redirect(url_for('tickets.create'))
         
@@ -46,42 +60,38 @@ def create():
             status='Abierto', 
             priority=request.form.get('priority', 'baja'),
             user_id=user_id,
-            category_id=category_id,
-            profile=category.technical_profile  # Set profile from category
+            category_id=category['id'],
+            profile=category['technical_profile']  # Set profile from category
         )
         
         db.session.add(new_ticket)
-        db.session.commit()
+        # Assigned in the same transaction: the id is needed for the emails, not a commit
+        db.session.flush()
         
-        technicians = Technician.query.all()
-        tech_list = [{'id': t.id, 'name': t.name, 'profile': t.technical_profile} for t in technicians]
-        
-        distributor = TicketDistributor(tech_list)
-        ticket_dict = {'id': new_ticket.id, 'description': new_ticket.description, 'profile': category.technical_profile}
+        distributor = registry.distributor()
+        ticket_dict = {'id': new_ticket.id, 'description': new_ticket.description,
+                       'profile': category['technical_profile'], 'priority': new_ticket.priority}
         
         assigned_tech = distributor.distribute_ticket(ticket_dict)
         technician_name = "Sin asignar"
         
         if assigned_tech:
             new_ticket.technician_id = assigned_tech['id']
-            db.session.commit()
             technician_name = assigned_tech["name"]
-            flash(f'Ticket creado y asignado a {technician_name}', 'success')
+            # Picking the technician counted the ticket in their workload
+            after_rollback(lambda: distributor.ticket_closed(assigned_tech['id'], new_ticket.priority))
 
             # Send email notification to technician
-            technician = Technician.query.get(assigned_tech['id'])
-            if technician and technician.email:
+            if assigned_tech['email']:
                 email_result = email_service.send_ticket_assignment_notification(
-                    technician.email,
-                    technician.name,
+                    assigned_tech['email'],
+                    assigned_tech['name'],
                     new_ticket.id,
                     new_ticket.description,
                     f"{user.nombre} {user.apellido}"
                 )
                 if not email_result["success"]:
                     current_app.logger.warning(f"Failed to send technician assignment email: {email_result['message']}")
-        else:
-            flash('Ticket creado pero no hay técnicos disponibles para esta área', 'warning')
         
         if user.email:
             email_result = email_service.send_ticket_creation_notification(
@@ -94,30 +104,51 @@ def create():
             
             if not email_result["success"]:
                 current_app.logger.warning(f"Failed to send ticket creation email: {email_result['message']}")
+        
+        # The ticket, its assignment and the queued notifications are saved together
+        db.session.commit()
+        
+        if assigned_tech:
+            flash(f'Ticket creado y asignado a {technician_name}', 'success')
+        else:
+            flash('Ticket creado pero no hay técnicos disponibles para esta área', 'warning')
             
         return redirect(url_for('tickets.list'))
     
     # Get active categories for the form
-    categories = TicketCategory.query.filter_by(active=True).all()
+    categories = get_registry().active_categories()
     return render_template('tickets/create.html', categories=categories)
 
 @tickets_bp.route('/tickets')
 @login_required
 def list():
-    # Get page from query parameters, default to 1 if not provided
-    page = request.args.get('page', 1, type=int)
     per_page = 15  # Number of tickets per page
     
     # Only show tickets for the current user unless they're an admin
     if session.get('user_role') == 'admin':
-        pagination = Ticket.query.order_by(Ticket.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False)
+        query = Ticket.query
     else:
-        pagination = Ticket.query.filter_by(user_id=session['user_id']).order_by(
-            Ticket.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        query = Ticket.query.filter_by(user_id=session['user_id'])
+    
+    # Newest first; the cursor in the URL marks where the previous page ended
+    total = query.count() if current_app.config.get('PAGINATION_EXACT_TOTALS') else None
+    pagination = keyset_paginate(query, Ticket.created_at, Ticket.id, per_page,
+                                 after=request.args.get('after'),
+                                 before=request.args.get('before'),
+                                 total=total)
     
     tickets = pagination.items
-    return render_template('tickets/list.html', tickets=tickets, pagination=pagination)
+    # The page changes exactly when one of its rows or the pagination does
+    etag = page_etag('tickets.list', [(t.id, t.updated_at) for t in tickets],
+                     pagination.has_next, pagination.has_prev, pagination.total)
+    return render_conditional('tickets/list.html', etag, tickets=tickets, pagination=pagination)
+
+def _render_ticket(ticket):
+    """Ticket page, or 304 if the client's copy is current: ticket edits move updated_at."""
+    technician = get_registry().technician(ticket.technician_id) if ticket.technician_id else None
+    etag = page_etag('tickets.view', ticket.id, ticket.updated_at, ticket.user_id, ticket.technician_id,
+                     technician['name'] if technician else None)
+    return render_conditional('tickets/view.html', etag, ticket.updated_at, ticket=ticket)
 
 @tickets_bp.route('/tickets/<int:ticket_id>')
 @login_required
@@ -126,24 +157,51 @@ def view(ticket_id):
     
     if session.get('user_role') == 'admin':
         # Admin can view all tickets
-        return render_template('tickets/view.html', ticket=ticket)
+        return _render_ticket(ticket)
     elif session.get('user_role') == 'technician':
         # Technicians can only view tickets if:
         # 1. They are assigned to the ticket OR
-        # 2. The ticket is unassigned AND in their technical area
+        # 2. The ticket is unassigned AND in their technical area OR
+        # 3. The ticket is closed AND in their technical area (prior solutions)
         if (ticket.technician_id == session['user_id'] or 
-            (ticket.technician_id is None and ticket.profile == session.get('technical_profile'))):
-            return render_template('tickets/view.html', ticket=ticket)
+            (ticket.technician_id is None and ticket.profile == session.get('technical_profile')) or
+            (ticket.status == 'Cerrado' and ticket.profile == session.get('technical_profile'))):
+            return _render_ticket(ticket)
     else:
         # Regular users can only view their own tickets
         if ticket.user_id == session['user_id']:
-            return render_template('tickets/view.html', ticket=ticket)
+            return _render_ticket(ticket)
     
     flash('No tienes permiso para ver este ticket', 'danger')
     return redirect(url_for('tickets.list'))
 
+@tickets_bp.route('/tickets/search')
+@login_required
+def search():
+    """Ranked full-text search over descriptions and solutions, as JSON."""
+    term = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    # Restrict results to the tickets the current account may view
+    role = session.get('user_role')
+    if role == 'admin':
+        scope = None
+    elif role == 'technician':
+        profile = session.get('technical_profile')
+        scope = (Ticket.technician_id == session['user_id']) | (
+            (Ticket.profile == profile) & (Ticket.technician_id.is_(None) | (Ticket.status == 'Cerrado')))
+    else:
+        scope = Ticket.user_id == session['user_id']
+    
+    results = search_tickets(term, scope=scope, limit=limit)
+    for result in results:
+        result['url'] = url_for('tickets.view', ticket_id=result['id'])
+        result['created_at'] = result['created_at'].isoformat() if result['created_at'] else None
+    return jsonify({'query': term, 'results': results})
+
 @tickets_bp.route('/tickets/<int:ticket_id>/update', methods=['POST'])
 @login_required
+@retry_on_busy
 def update_status(ticket_id):
     ticket = Ticket.query.get_or_404(ticket_id)
     email_service = EmailService()  # Initialize EmailService here
@@ -165,6 +223,7 @@ def update_status(ticket_id):
     if new_status and new_status in ['Abierto', 'En Proceso', 'Cerrado']:
         old_status = ticket.status
         ticket.status = new_status
+        was_open = old_status in OPEN_STATUSES
         
         # If closing ticket, solution is required
         if new_status == 'Cerrado':
@@ -175,8 +234,8 @@ def update_status(ticket_id):
             
             # Send solution email only when closing the ticket
             user = User.query.get(ticket.user_id) if ticket.user_id else None
-            technician = Technician.query.get(ticket.technician_id) if ticket.technician_id else None
-            technician_name = technician.name if technician else "Not assigned"
+            technician = get_registry().technician(ticket.technician_id) if ticket.technician_id else None
+            technician_name = technician['name'] if technician else "Not assigned"
             
             if user and user.email:
                 email_result = email_service.send_ticket_status_update(
@@ -193,6 +252,12 @@ def update_status(ticket_id):
                     current_app.logger.warning(f"Failed to send solution email: {email_result['message']}")
             
         db.session.commit()
+        
+        # Keep the assignment strategy's workload in step
+        if was_open and new_status not in OPEN_STATUSES:
+            get_registry().distributor().ticket_closed(ticket.technician_id, ticket.priority)
+        elif not was_open and new_status in OPEN_STATUSES:
+            get_registry().distributor().ticket_opened(ticket.technician_id, ticket.priority)
         flash(f'Estado del ticket actualizado de {old_status} a {new_status}', 'success')
     else:
         flash('Estado inválido', 'danger')
@@ -204,6 +269,7 @@ def update_status(ticket_id):
 
 @tickets_bp.route('/tickets/<int:ticket_id>/update_priority', methods=['POST'])
 @login_required
+@retry_on_busy
 def update_priority(ticket_id):
     if session.get('user_role') != 'admin':
         flash('No tienes permiso para actualizar la prioridad de tickets', 'danger')
@@ -216,6 +282,10 @@ def update_priority(ticket_id):
         old_priority = ticket.priority
         ticket.priority = new_priority
         db.session.commit()
+        if ticket.status in OPEN_STATUSES:
+            distributor = get_registry().distributor()
+            distributor.ticket_closed(ticket.technician_id, old_priority)
+            distributor.ticket_opened(ticket.technician_id, new_priority)
         flash(f'Prioridad del ticket actualizada de {old_priority.title()} a {new_priority.title()}', 'success')
     else:
         flash('Prioridad inválida', 'danger')
@@ -224,14 +294,19 @@ def update_priority(ticket_id):
 
 @tickets_bp.route('/tickets/<int:ticket_id>/delete', methods=['POST'])
 @login_required
+@retry_on_busy
 def delete_ticket(ticket_id):
     if session.get('user_role') != 'admin':
         flash('No tienes permiso para eliminar tickets', 'danger')
         return redirect(url_for('tickets.list'))
         
     ticket = Ticket.query.get_or_404(ticket_id)
+    was_open = ticket.status in OPEN_STATUSES
+    technician_id, priority = ticket.technician_id, ticket.priority
     db.session.delete(ticket)
     db.session.commit()
+    if was_open:
+        get_registry().distributor().ticket_closed(technician_id, priority)
     flash('Ticket eliminado exitosamente', 'success')
     return redirect(url_for('tickets.list'))
 
@@ -245,68 +320,57 @@ def technician_dashboard():
     technician_id = session.get('user_id')
     today = datetime.utcnow().date()
     
-    # Get pagination parameters
-    page = request.args.get('page', 1, type=int)
     per_page = 15  # Number of tickets per page
     section = request.args.get('section', 'open')  # Default to open section
+    if section not in TECHNICIAN_SECTIONS:
+        section = 'open'
+    status, sort_column = TECHNICIAN_SECTIONS[section]
     
-    # Get unique departments for filter dropdowns
-    departments = db.session.query(User.departamento).filter(
-        User.departamento.isnot(None)).distinct().all()
-    departments = [dept[0] for dept in departments if dept[0]]
-    
-    # Get tickets assigned to this technician by status
-    open_pagination = Ticket.query.filter_by(
-        technician_id=technician_id,
-        status='Abierto'
-    ).order_by(Ticket.created_at.desc()).paginate(
-        page=(page if section == 'open' else 1), 
-        per_page=per_page, 
-        error_out=False
-    )
+    # Calculate statistics: every count in one pass over this technician's tickets
+    open_count, in_progress_count, closed_count, closed_today = db.session.query(
+        func.count(case((Ticket.status == 'Abierto', 1))),
+        func.count(case((Ticket.status == 'En Proceso', 1))),
+        func.count(case((Ticket.status == 'Cerrado', 1))),
+        func.count(case(((Ticket.status == 'Cerrado') & (Ticket.updated_at >= today), 1)))
+    ).filter(Ticket.technician_id == technician_id).one()
+    stats = {
+        'open_tickets': open_count,
+        'in_progress_tickets': in_progress_count,
+        'closed_tickets': closed_count,
+        'closed_today': closed_today
+    }
+    section_totals = {'open': open_count, 'in_progress': in_progress_count, 'closed': closed_count}
     
-    in_progress_pagination = Ticket.query.filter_by(
+    # Only the section being viewed is listed, with the dashboard filters
+    # applied; the others show their count and are loaded on demand
+    filters = get_ticket_filters(request.args)
+    # The creator is shown on every row, so load it in the same query
+    query = apply_ticket_filters(Ticket.query.options(joinedload(Ticket.user)).filter_by(
         technician_id=technician_id,
-        status='En Proceso'
-    ).order_by(Ticket.created_at.desc()).paginate(
-        page=(page if section == 'in_progress' else 1), 
-        per_page=per_page, 
-        error_out=False
-    )
+        status=status
+    ), filters)
     
-    closed_pagination = Ticket.query.filter_by(
-        technician_id=technician_id,
-        status='Cerrado'
-    ).order_by(Ticket.updated_at.desc()).paginate(
-        page=(page if section == 'closed' else 1), 
-        per_page=per_page, 
-        error_out=False
-    )
+    if not filters:
+        total = section_totals[section]
+    elif current_app.config.get('PAGINATION_EXACT_TOTALS'):
+        total = query.order_by(None).count()
+    else:
+        total = None
+    pagination = keyset_paginate(query, sort_column, Ticket.id, per_page,
+                                 after=request.args.get('after'),
+                                 before=request.args.get('before'),
+                                 total=total)
     
-    # Calculate statistics
-    stats = {
-        'open_tickets': Ticket.query.filter_by(
-            technician_id=technician_id,
-            status='Abierto'
-        ).count(),
-        'in_progress_tickets': Ticket.query.filter_by(
-            technician_id=technician_id,
-            status='En Proceso'
-        ).count(),
-        'closed_today': Ticket.query.filter(
-            Ticket.technician_id == technician_id,
-            Ticket.status == 'Cerrado',
-            Ticket.updated_at >= today
-        ).count()
-    }
+    # Departments for the filter dropdown, from the registry instead of a query per render
+    departments = get_registry().departments()
     
-    return render_template('tickets/technician_dashboard.html',
-                         open_tickets=open_pagination.items,
-                         in_progress_tickets=in_progress_pagination.items,
-                         closed_tickets=closed_pagination.items,
-                         open_pagination=open_pagination,
-                         in_progress_pagination=in_progress_pagination,
-                         closed_pagination=closed_pagination,
+    etag = page_etag('tickets.technician_dashboard', section, stats, filters, departments,
+                     [(t.id, t.updated_at, t.user_id) for t in pagination.items],
+                     pagination.has_next, pagination.has_prev, pagination.total)
+    return render_conditional('tickets/technician_dashboard.html', etag,
+                         tickets=pagination.items,
+                         pagination=pagination,
                          departments=departments,
                          stats=stats,
-                         current_section=section)
\ No newline at end of file
+                         current_section=section,
+                         filters=filters)
\ No newline at end of file
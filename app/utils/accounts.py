@@ -0,0 +1,60 @@
+from sqlalchemy import select, literal, union_all, update
+from app import db
+from app.models.user import User
+from app.models.technician import Technician
+
+def find_login_account(dni):
+    """
+    Find the account someone is logging in with, in a single query.
+
+    'admin' logs in as the administrator. Any other DNI is looked up in the
+    technicians and users tables together, technicians first, using their
+    unique DNI indexes. Only the columns the login needs are loaded.
+
+    Args:
+        dni: DNI entered in the login form
+
+    Returns:
+        Row with kind ('admin', 'technician' or 'user'), id, name,
+        password_hash, active and profile, or None if there is no such account
+    """
+    if dni == 'admin':
+        stmt = select(
+            literal('admin').label('kind'),
+            User.id,
+            (User.nombre + ' ' + User.apellido).label('name'),
+            User.password_hash,
+            literal(True).label('active'),
+            literal(None).label('profile'),
+        ).where(User.role == 'admin').limit(1)
+        return db.session.execute(stmt).first()
+
+    technicians = select(
+        literal('technician').label('kind'),
+        Technician.id,
+        Technician.name.label('name'),
+        Technician.password_hash,
+        Technician.active.label('active'),
+        Technician.technical_profile.label('profile'),
+        literal(0).label('rank'),
+    ).where(Technician.dni == dni)
+    users = select(
+        literal('user').label('kind'),
+        User.id,
+        (User.nombre + ' ' + User.apellido).label('name'),
+        User.password_hash,
+        literal(True).label('active'),
+        literal(None).label('profile'),
+        literal(1).label('rank'),
+    ).where(User.dni == dni)
+    accounts = union_all(technicians, users).subquery()
+    stmt = select(
+        accounts.c.kind, accounts.c.id, accounts.c.name,
+        accounts.c.password_hash, accounts.c.active, accounts.c.profile
+    ).order_by(accounts.c.rank).limit(1)
+    return db.session.execute(stmt).first()
+
+def store_password_hash(account, password_hash):
+    """Replace the password hash of an account returned by find_login_account. Does not commit."""
+    model = Technician if account.kind == 'technician' else User
+    db.session.execute(update(model).where(model.id == account.id).values(password_hash=password_hash))
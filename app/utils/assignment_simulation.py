@@ -0,0 +1,116 @@
+import heapq
+from statistics import median
+from app import db
+from app.models.ticket import Ticket
+from app.utils.ticket_distributor import create_strategy
+
+# Service time used when there are no closed tickets to learn it from
+DEFAULT_SERVICE_SECONDS = 3600
+
+def load_history(limit=None):
+    """
+    Load past tickets to replay, oldest first.
+
+    A closed ticket's service time is the time between its creation and its
+    last update. That also includes the time it waited in the original
+    queue, so absolute numbers are pessimistic; the comparison between
+    strategies is what matters. Tickets still open get the median service
+    time of the closed ones.
+
+    Args:
+        limit: Only replay the most recent tickets
+
+    Returns:
+        List of dictionaries with profile, priority, arrival and service (seconds)
+    """
+    query = db.session.query(
+        Ticket.profile, Ticket.priority, Ticket.status, Ticket.created_at, Ticket.updated_at
+    ).filter(Ticket.created_at.isnot(None)).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    if limit:
+        query = query.limit(limit)
+    rows = list(reversed(query.all()))
+    if not rows:
+        return []
+
+    origin = rows[0].created_at
+    durations = [
+        (row.updated_at - row.created_at).total_seconds()
+        for row in rows
+        if row.status == 'Cerrado' and row.updated_at and row.updated_at >= row.created_at
+    ]
+    default_service = median(durations) if durations else DEFAULT_SERVICE_SECONDS
+
+    history = []
+    for row in rows:
+        if row.status == 'Cerrado' and row.updated_at and row.updated_at >= row.created_at:
+            service = (row.updated_at - row.created_at).total_seconds()
+        else:
+            service = default_service
+        history.append({
+            'profile': row.profile,
+            'priority': row.priority,
+            'arrival': (row.created_at - origin).total_seconds(),
+            'service': service,
+        })
+    return history
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+def simulate(strategy_name, technicians_by_profile, history, weights=None):
+    """
+    Replay tickets through an assignment strategy.
+
+    Each technician works on its tickets one at a time in the order they were
+    assigned. A ticket's queue time is the time between its arrival and the
+    moment its technician starts on it. The strategy is told when tickets
+    are assigned and finished, exactly as in the application.
+
+    Returns:
+        Dictionary with the strategy name, number of tickets replayed and
+        skipped, queue-time percentiles in seconds, and the largest number
+        of open tickets any technician had
+    """
+    strategy = create_strategy(strategy_name, technicians_by_profile, {}, weights)
+    busy_until = {}
+    open_count = {}
+    finishing = []  # (finish time, order, technician id, priority)
+    queue_times = []
+    skipped = 0
+    max_backlog = 0
+
+    for order, ticket in enumerate(history):
+        arrival = ticket['arrival']
+        while finishing and finishing[0][0] <= arrival:
+            _, _, tech_id, priority = heapq.heappop(finishing)
+            open_count[tech_id] -= 1
+            strategy.ticket_closed(tech_id, priority)
+
+        technician = strategy.pick(ticket['profile'], ticket['priority'])
+        if not technician:
+            skipped += 1
+            continue
+        tech_id = technician['id']
+        start = max(arrival, busy_until.get(tech_id, 0.0))
+        finish = start + ticket['service']
+        busy_until[tech_id] = finish
+        open_count[tech_id] = open_count.get(tech_id, 0) + 1
+        max_backlog = max(max_backlog, open_count[tech_id])
+        queue_times.append(start - arrival)
+        heapq.heappush(finishing, (finish, order, tech_id, ticket['priority']))
+
+    queue_times.sort()
+    return {
+        'strategy': strategy_name,
+        'tickets': len(queue_times),
+        'skipped': skipped,
+        'mean': sum(queue_times) / len(queue_times) if queue_times else 0.0,
+        'p50': _percentile(queue_times, 0.50),
+        'p90': _percentile(queue_times, 0.90),
+        'p99': _percentile(queue_times, 0.99),
+        'max': queue_times[-1] if queue_times else 0.0,
+        'max_backlog': max_backlog,
+    }
@@ -0,0 +1,320 @@
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import threading
+import time
+from datetime import datetime
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+from sqlalchemy import select, func
+from app import db
+from app.models.user import User
+from app.models.technician import Technician
+from app.models.category import TicketCategory
+from app.models.ticket import Ticket
+from app.utils.query_counter import count_queries
+from app.utils.synthetic_data import table_sizes
+from app.utils.fake_gas import FakeGasServer
+from app.utils.gas_transport import reset_transports
+
+class _Scenario:
+    """One endpoint to benchmark: who calls it and how each request is built."""
+
+    def __init__(self, name, role, method, url, data=None):
+        self.name = name
+        self.role = role
+        self.method = method
+        self._url = url
+        self._data = data
+
+    def request(self, fixtures, number):
+        url = self._url(fixtures, number) if callable(self._url) else self._url
+        data = self._data(fixtures, number) if self._data else None
+        return url, data
+
+def _update_status_url(fixtures, number):
+    tickets = fixtures['technician_tickets']
+    return f"/tickets/{tickets[number % len(tickets)]}/update"
+
+def _update_status_data(fixtures, number):
+    # Alternate between the two open statuses so tickets never need a solution
+    return {'status': 'En Proceso' if (number // len(fixtures['technician_tickets'])) % 2 == 0 else 'Abierto'}
+
+def _create_data(fixtures, number):
+    return {'description': f'Prueba de carga {number}: la impresora no imprime',
+            'category_id': str(fixtures['category_id']), 'priority': 'media'}
+
+SCENARIOS = [
+    _Scenario('tickets.list', 'user', 'GET', '/tickets'),
+    _Scenario('tickets.create', 'user', 'POST', '/tickets/create', _create_data),
+    _Scenario('tickets.update_status', 'technician', 'POST', _update_status_url, _update_status_data),
+    _Scenario('admin.dashboard', 'admin', 'GET', '/admin/dashboard'),
+    _Scenario('tickets.technician_dashboard', 'technician', 'GET', '/technician/dashboard'),
+]
+
+def load_fixtures():
+    """
+    Pick the accounts and tickets the scenarios use.
+
+    The user and technician with the most tickets are chosen, so list views
+    are measured at their largest.
+
+    Raises:
+        ValueError: If the database lacks the data a scenario needs
+    """
+    admin = db.session.execute(select(User.id, User.nombre, User.apellido).where(User.role == 'admin')).first()
+    user_id = db.session.scalar(
+        select(Ticket.user_id).where(Ticket.user_id.isnot(None))
+        .group_by(Ticket.user_id).order_by(func.count().desc()).limit(1))
+    technician_id = db.session.scalar(
+        select(Ticket.technician_id).where(Ticket.technician_id.isnot(None), Ticket.status.in_(('Abierto', 'En Proceso')))
+        .group_by(Ticket.technician_id).order_by(func.count().desc()).limit(1))
+    category_id = db.session.scalar(select(TicketCategory.id).where(TicketCategory.active.is_(True)).limit(1))
+    if not (admin and user_id and technician_id and category_id):
+        raise ValueError('La base de datos necesita un administrador, categorías y tickets abiertos asignados; '
+                         'ejecute flask seed-defaults y flask seed-synthetic.')
+    user = db.session.get(User, user_id)
+    technician = db.session.get(Technician, technician_id)
+    technician_tickets = db.session.scalars(
+        select(Ticket.id).where(Ticket.technician_id == technician_id, Ticket.status.in_(('Abierto', 'En Proceso')))
+        .order_by(Ticket.id).limit(100)).all()
+    return {
+        'sessions': {
+            'admin': {'user_id': admin.id, 'user_role': 'admin', 'user_name': f"{admin.nombre} {admin.apellido}"},
+            'user': {'user_id': user.id, 'user_role': 'user', 'user_name': f"{user.nombre} {user.apellido}"},
+            'technician': {'user_id': technician.id, 'user_role': 'technician', 'user_name': technician.name,
+                           'technical_profile': technician.technical_profile},
+        },
+        'technician_tickets': technician_tickets,
+        'category_id': category_id,
+    }
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)]
+
+def _stats(latencies, errors, wall_seconds, queries=None):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'mean_ms': sum(latencies) / count * 1000 if count else None,
+        'p50_ms': (_percentile(latencies, 0.50) or 0) * 1000,
+        'p95_ms': (_percentile(latencies, 0.95) or 0) * 1000,
+        'p99_ms': (_percentile(latencies, 0.99) or 0) * 1000,
+        'throughput_rps': count / wall_seconds if wall_seconds else None,
+        'queries_per_request': queries / count if queries is not None and count else None,
+    }
+
+def run_client(app, scenarios, fixtures, requests_per_scenario, warmup=5):
+    """
+    Drive each scenario sequentially through the Flask test client.
+
+    Measures the application alone, without HTTP, and counts the SQL
+    statements per request.
+    """
+    results = {}
+    for scenario in scenarios:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update(fixtures['sessions'][scenario.role])
+
+        def call(number):
+            url, data = scenario.request(fixtures, number)
+            return client.open(url, method=scenario.method, data=data)
+
+        for number in range(warmup):
+            call(number)
+        latencies, errors = [], 0
+        with count_queries() as counter:
+            started = time.perf_counter()
+            for number in range(warmup, warmup + requests_per_scenario):
+                begin = time.perf_counter()
+                response = call(number)
+                latencies.append(time.perf_counter() - begin)
+                errors += response.status_code >= 400
+            wall = time.perf_counter() - started
+        results[scenario.name] = _stats(latencies, errors, wall, counter.count)
+    return results
+
+def _serve(app, fd):
+    """Worker process: answer requests on the shared listening socket until terminated."""
+    import logging
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    # Pooled GAS connections inherited from the parent must not be shared either
+    reset_transports()
+    with app.app_context():
+        # Connections inherited from the parent must not be shared
+        db.engine.dispose(close=False)
+    make_server('127.0.0.1', 0, app, fd=fd).serve_forever()
+
+def run_server(app, scenarios, fixtures, requests_per_scenario, workers=4, concurrency=8):
+    """
+    Drive each scenario over HTTP against a local pre-forked WSGI server.
+
+    `workers` processes accept connections on one socket, like a
+    pre-forking production server; `concurrency` client threads send
+    requests in parallel. Requires the fork start method (Linux, macOS).
+    """
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(128)
+    port = listener.getsockname()[1]
+    listener.set_inheritable(True)
+
+    db.session.remove()
+    db.engine.dispose()
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_serve, args=(app, listener.fileno()), daemon=True) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    serializer = app.session_interface.get_signing_serializer(app)
+    cookie_name = app.config.get('SESSION_COOKIE_NAME', 'session')
+    cookies = {role: f"{cookie_name}={serializer.dumps(values)}" for role, values in fixtures['sessions'].items()}
+
+    results = {}
+    try:
+        for scenario in scenarios:
+            counter = iter(range(requests_per_scenario))
+            lock = threading.Lock()
+            latencies, errors = [], []
+
+            def client():
+                while True:
+                    with lock:
+                        number = next(counter, None)
+                    if number is None:
+                        return
+                    url, data = scenario.request(fixtures, number)
+                    body = urlencode(data) if data else None
+                    headers = {'Cookie': cookies[scenario.role]}
+                    if body:
+                        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+                    begin = time.perf_counter()
+                    try:
+                        connection = HTTPConnection('127.0.0.1', port, timeout=60)
+                        connection.request(scenario.method, url, body=body, headers=headers)
+                        status = connection.getresponse().status
+                        connection.close()
+                    except OSError:
+                        status = 599
+                    elapsed = time.perf_counter() - begin
+                    with lock:
+                        latencies.append(elapsed)
+                        errors.append(status >= 400)
+
+            threads = [threading.Thread(target=client) for _ in range(concurrency)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results[scenario.name] = _stats(latencies, sum(errors), time.perf_counter() - started)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        listener.close()
+    return results
+
+def run_benchmark(app, modes=('client', 'server'), scenario_names=None, requests_per_scenario=200,
+                  workers=4, concurrency=8, fake_gas=None):
+    """
+    Run the benchmark scenarios and return the report saved as a baseline.
+
+    Scenarios write to the database (new tickets, status changes): run it
+    against a copy or a database filled with flask seed-synthetic.
+
+    Args:
+        fake_gas: FakeGasServer settings (latency, error_rate...). When given,
+            a fake Apps Script server is started and email is sent to it
+            synchronously, without the outbox, so its slowness and faults
+            show in the request latency
+
+    Returns:
+        Dictionary with run metadata, table sizes and results by mode and scenario
+    """
+    scenarios = [s for s in SCENARIOS if not scenario_names or s.name in scenario_names]
+    fixtures = load_fixtures()
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': db.engine.dialect.name,
+        'tables': table_sizes(),
+        'settings': {'requests': requests_per_scenario, 'workers': workers, 'concurrency': concurrency},
+        'results': {},
+    }
+    if fake_gas is None:
+        _run_modes(app, report, modes, scenarios, fixtures, requests_per_scenario, workers, concurrency)
+        return report
+
+    token = app.config.get('GOOGLE_DRIVE_SECURE_TOKEN') or 'benchmark-token'
+    saved_config = {key: app.config.get(key) for key in ('GOOGLE_DRIVE_SECURE_TOKEN', 'EMAIL_OUTBOX_ENABLED')}
+    saved_url = os.environ.get('GAS_DEPLOYMENT_URL')
+    with FakeGasServer(token, **fake_gas) as server:
+        app.config.update(GOOGLE_DRIVE_SECURE_TOKEN=token, EMAIL_OUTBOX_ENABLED=False)
+        os.environ['GAS_DEPLOYMENT_URL'] = server.url
+        reset_transports()
+        try:
+            _run_modes(app, report, modes, scenarios, fixtures, requests_per_scenario, workers, concurrency)
+        finally:
+            app.config.update(saved_config)
+            if saved_url is None:
+                os.environ.pop('GAS_DEPLOYMENT_URL', None)
+            else:
+                os.environ['GAS_DEPLOYMENT_URL'] = saved_url
+            reset_transports()
+        report['settings']['fake_gas'] = fake_gas
+        report['fake_gas'] = dict(server.stats)
+    return report
+
+def _run_modes(app, report, modes, scenarios, fixtures, requests_per_scenario, workers, concurrency):
+    if 'client' in modes:
+        report['results']['client'] = run_client(app, scenarios, fixtures, requests_per_scenario)
+    if 'server' in modes:
+        report['results']['server'] = run_server(app, scenarios, fixtures, requests_per_scenario,
+                                                 workers, concurrency)
+
+def compare(report, baseline, threshold=20.0):
+    """
+    Compare a report with a saved baseline.
+
+    A scenario regresses when its p95 latency grows, or its throughput
+    drops, by more than threshold percent.
+
+    Returns:
+        Tuple (rows, regressions): rows are (mode, scenario, metric, before,
+        after, change %) and regressions the subset beyond the threshold
+    """
+    rows, regressions = [], []
+    for mode, scenarios in report['results'].items():
+        for name, stats in scenarios.items():
+            before = baseline.get('results', {}).get(mode, {}).get(name)
+            if not before:
+                continue
+            for metric, worse_when_higher in (('p95_ms', True), ('throughput_rps', False), ('queries_per_request', True)):
+                old, new = before.get(metric), stats.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old * 100
+                row = (mode, name, metric, old, new, change)
+                rows.append(row)
+                if (change if worse_when_higher else -change) > threshold:
+                    regressions.append(row)
+    return rows, regressions
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,197 @@
+from flask import current_app
+from sqlalchemy import select, update
+from app import db
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.utils.email_service import EmailService
+from app.utils.registry import get_registry, OPEN_STATUSES
+from app.utils.ticket_filters import apply_ticket_filters
+from app.utils.transactions import after_rollback
+
+BULK_ACTIONS = ('status', 'priority', 'reassign')
+TICKET_STATUSES = ('Abierto', 'En Proceso', 'Cerrado')
+TICKET_PRIORITIES = ('baja', 'media', 'alta', 'maxima')
+
+def _selection(ticket_ids, filters):
+    """SQL condition for the tickets chosen by id or by dashboard filters."""
+    if ticket_ids:
+        return Ticket.id.in_(ticket_ids)
+    if filters:
+        return Ticket.id.in_(apply_ticket_filters(select(Ticket.id), filters))
+    raise ValueError('Seleccione al menos un ticket o aplique un filtro.')
+
+def _change(action, value, solution):
+    """Values to write and the condition matching the tickets they would change."""
+    if action == 'status':
+        if value not in TICKET_STATUSES:
+            raise ValueError('Estado inválido.')
+        if value == 'Cerrado':
+            if not solution:
+                raise ValueError('Se requiere una descripción de la solución al cerrar tickets.')
+            return {'status': value, 'solution': solution}, Ticket.status.is_distinct_from(value)
+        return {'status': value}, Ticket.status.is_distinct_from(value)
+    if action == 'priority':
+        if value not in TICKET_PRIORITIES:
+            raise ValueError('Prioridad inválida.')
+        return {'priority': value}, Ticket.priority != value
+    if action == 'reassign':
+        technician_id = None
+        if value:
+            try:
+                technician_id = int(value)
+            except ValueError:
+                technician_id = -1
+            target = get_registry().technician(technician_id)
+            # Deactivated technicians take no new tickets, in bulk or otherwise
+            if not target or not target['active']:
+                raise ValueError('Técnico inválido.')
+        return {'technician_id': technician_id}, Ticket.technician_id.is_distinct_from(technician_id)
+    raise ValueError('Acción inválida.')
+
+def bulk_update_tickets(action, value, ticket_ids=None, filters=None, solution=None):
+    """
+    Apply one change to many tickets in a single UPDATE and transaction.
+
+    The notifications the change causes are queued together: one solution
+    email per closed ticket, written to the outbox with one INSERT, and one
+    email per technician listing all the tickets assigned to them.
+
+    Args:
+        action: 'status', 'priority' or 'reassign'
+        value: New status, priority, or technician id ('' to unassign)
+        ticket_ids: IDs of the selected tickets
+        filters: Dashboard filters selecting the tickets, used when no IDs are given
+        solution: Solution text, required when closing tickets
+
+    Returns:
+        Dictionary with the number of tickets updated and notifications queued
+
+    Raises:
+        ValueError: With a message for the user if the request is invalid
+    """
+    values, changes = _change(action, value, solution)
+    selected = _selection(ticket_ids, filters)
+
+    # The tickets that will actually change, for notifications and workload tracking
+    affected = db.session.query(
+        Ticket.id, Ticket.description, Ticket.status, Ticket.priority,
+        Ticket.technician_id, Ticket.user_id
+    ).filter(selected, changes).all()
+    if not affected:
+        return {'updated': 0, 'notifications': 0}
+
+    updated = Ticket.query.filter(selected, changes).update(values, synchronize_session=False)
+
+    registry = get_registry()
+    messages = []
+    if action == 'status' and values['status'] == 'Cerrado':
+        users = {
+            user.id: user for user in db.session.query(
+                User.id, User.email, User.nombre, User.apellido
+            ).filter(User.id.in_({t.user_id for t in affected if t.user_id}))
+        }
+        for ticket in affected:
+            user = users.get(ticket.user_id)
+            if not user or not user.email:
+                continue
+            technician = registry.technician(ticket.technician_id)
+            messages.append(("sendTicketStatusUpdateNotification", [
+                user.email,
+                f"{user.nombre} {user.apellido}",
+                ticket.id,
+                ticket.description,
+                'Cerrado',
+                technician['name'] if technician else "Not assigned",
+                solution
+            ]))
+    elif action == 'reassign' and values['technician_id']:
+        technician = registry.technician(values['technician_id'])
+        assigned = [{'id': t.id, 'description': t.description, 'priority': t.priority}
+                    for t in affected if t.status in OPEN_STATUSES]
+        if assigned and technician['email']:
+            messages.append(("sendBulkAssignmentNotification", [
+                technician['email'], technician['name'], assigned
+            ]))
+
+    if messages:
+        results = EmailService().send_many(messages)
+        failed = sum(1 for result in results if not result['success'])
+        if failed:
+            current_app.logger.warning(f"Bulk {action}: {failed} of {len(messages)} notifications failed")
+    db.session.commit()
+
+    # Keep the assignment strategy's workload in step
+    distributor = registry.distributor()
+    for ticket in affected:
+        was_open = ticket.status in OPEN_STATUSES
+        now_open = values.get('status', ticket.status) in OPEN_STATUSES
+        if was_open:
+            distributor.ticket_closed(ticket.technician_id, ticket.priority)
+        if now_open:
+            distributor.ticket_opened(values.get('technician_id', ticket.technician_id),
+                                      values.get('priority', ticket.priority))
+
+    current_app.logger.info(f"Bulk {action} to {value!r}: {updated} tickets updated")
+    return {'updated': updated, 'notifications': len(messages)}
+
+def release_technician_tickets(technician, reassign=True, detach_closed=False):
+    """
+    Move the open tickets of a technician who is leaving, without loading them as objects.
+
+    Open tickets are given to other active technicians of the same profile by
+    the configured assignment strategy, and written with one executemany
+    UPDATE; those nobody can take, or all of them when reassign is False,
+    are left unassigned. The technician must already be marked inactive and
+    flushed so the strategy no longer considers them. Does not commit.
+
+    Args:
+        technician: Technician who is being deactivated or deleted
+        reassign: Give open tickets to other technicians instead of unassigning them
+        detach_closed: Also unassign closed tickets, needed before deleting the technician
+
+    Returns:
+        Dictionary with the number of tickets reassigned and unassigned
+    """
+    registry = get_registry()
+    registry.invalidate()
+    open_filter = (Ticket.technician_id == technician.id, Ticket.status.in_(OPEN_STATUSES))
+
+    assignments = []
+    if reassign:
+        distributor = registry.distributor()
+        # Picking counted each ticket in its new technician's workload; if the
+        # transaction fails, reload the workload from the database instead
+        after_rollback(registry.invalidate)
+        open_tickets = db.session.query(
+            Ticket.id, Ticket.description, Ticket.priority, Ticket.profile
+        ).filter(*open_filter).all()
+        by_technician = {}
+        for ticket in open_tickets:
+            target = distributor.distribute_ticket({'id': ticket.id, 'profile': ticket.profile,
+                                                    'priority': ticket.priority})
+            if target:
+                assignments.append({'id': ticket.id, 'technician_id': target['id']})
+                by_technician.setdefault(target['id'], []).append(
+                    {'id': ticket.id, 'description': ticket.description, 'priority': ticket.priority})
+        if assignments:
+            db.session.execute(update(Ticket), assignments)
+
+        # One email per technician listing the tickets they received
+        messages = []
+        for technician_id, tickets in by_technician.items():
+            target = registry.technician(technician_id)
+            if target['email']:
+                messages.append(("sendBulkAssignmentNotification", [target['email'], target['name'], tickets]))
+        if messages:
+            EmailService().send_many(messages)
+
+    # Whatever is still assigned to the technician is left without one
+    unassigned = Ticket.query.filter(*open_filter).update(
+        {'technician_id': None}, synchronize_session=False)
+    if detach_closed:
+        Ticket.query.filter(Ticket.technician_id == technician.id).update(
+            {'technician_id': None}, synchronize_session=False)
+
+    current_app.logger.info(
+        f"Released tickets of technician {technician.id}: {len(assignments)} reassigned, {unassigned} unassigned")
+    return {'reassigned': len(assignments), 'unassigned': unassigned}
@@ -0,0 +1,75 @@
+import hashlib
+import os
+from datetime import timezone
+from flask import current_app, make_response, render_template, request, session
+
+# Newest modification time of the code and templates, read once per process
+_release = None
+
+def _release_marker():
+    """Changes when a deploy changes the code or templates, so cached pages are not reused across versions."""
+    global _release
+    if _release is None:
+        newest = 0
+        for directory, _, files in os.walk(current_app.root_path):
+            for name in files:
+                if name.endswith(('.py', '.html')):
+                    newest = max(newest, os.stat(os.path.join(directory, name)).st_mtime)
+        _release = repr(newest)
+    return _release
+
+def page_etag(*parts):
+    """
+    Weak validator for a page built from parts.
+
+    parts must cover everything the page shows, typically (id, updated_at)
+    of its tickets; the signed-in account, which the layout shows, and the
+    application version are added here.
+    """
+    viewer = (session.get('user_id'), session.get('user_role'), session.get('user_name'),
+              session.get('technical_profile'))
+    return hashlib.blake2b(repr((_release_marker(), viewer, parts)).encode('utf-8'), digest_size=12).hexdigest()
+
+def _client_has(etag, last_modified):
+    # If-None-Match takes precedence; If-Modified-Since is only for clients without the ETag
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+def render_conditional(template, etag, last_modified=None, **context):
+    """
+    Render a page, or answer 304 Not Modified when the client's copy is current.
+
+    The response carries the weak ETag (and Last-Modified if given) with
+    Cache-Control "private, no-cache", so browsers keep the page but ask
+    every time, and a refresh with nothing changed skips rendering the
+    template. Pages showing flashed messages are rendered without
+    validators: the messages are shown once, so that page must not be reused.
+
+    Args:
+        template: Template to render
+        etag: Value from page_etag
+        last_modified: Naive UTC datetime of the page's latest change, if known
+        context: Template variables
+
+    Returns:
+        Response
+    """
+    if session.get('_flashes'):
+        return render_template(template, **context)
+    if last_modified is not None:
+        # HTTP dates have whole seconds
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    if _client_has(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render_template(template, **context))
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
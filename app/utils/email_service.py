@@ -1,27 +1,37 @@
-import requests
 import json
 import os
-from flask import current_app, url_for
+from flask import current_app, url_for, has_request_context
 import traceback
 
 class EmailService:
     """
     Service to handle email communications for the help desk system.
     This service connects to Google Apps Script web app to send emails.
+    Instances are cheap: connections, timeouts, retries and the circuit
+    breaker live in the process-wide GasTransport.
     """
     
-    def __init__(self, deployment_url=None):
+    def __init__(self, deployment_url=None, deferred=None):
         """
         Initialize the email service with the GAS deployment URL.
         
         Args:
             deployment_url: URL to the deployed Google Apps Script web app
+            deferred: If True, messages are written to the email outbox and
+                delivered later by the email worker. Defaults to the
+                EMAIL_OUTBOX_ENABLED setting.
         """
         self.deployment_url = deployment_url or os.environ.get('GAS_DEPLOYMENT_URL')
+        if deferred is None:
+            deferred = current_app.config.get('EMAIL_OUTBOX_ENABLED', True)
+        self.deferred = deferred
         
-    def _make_request(self, function_name, parameters):
+    def _send(self, function_name, parameters):
         """
-        Make an authenticated request to the Google Apps Script web app.
+        Deliver a message or queue it in the outbox, depending on the mode.
+        
+        Without the outbox, a message sent while handling a request goes out
+        after the request's transaction commits, and not at all if it rolls back.
         
         Args:
             function_name: Name of the GAS function to call
@@ -30,58 +40,205 @@ class EmailService:
         Returns:
             Dictionary with success status and message
         """
+        if self.deferred:
+            return self.enqueue(function_name, parameters)
+        if has_request_context():
+            # Send only once the request's changes are saved, and only if they are
+            from app.utils.transactions import after_commit
+            after_commit(lambda: self._make_request(function_name, parameters))
+            return {"success": True, "message": "Correo programado para después de guardar los cambios"}
+        return self._make_request(function_name, parameters)
+        
+    def enqueue(self, function_name, parameters):
+        """
+        Add a message to the email outbox.
+        
+        The row is only added to the current session; it is persisted by the
+        caller's commit, so the email is sent if and only if the surrounding
+        changes are saved.
+        
+        Args:
+            function_name: Name of the GAS function to call
+            parameters: List of parameters for the function
+            
+        Returns:
+            Dictionary with success status and message
+        """
+        from app import db
+        from app.models.email_outbox import EmailOutbox
+        
+        message = EmailOutbox(function_name=function_name)
+        message.set_parameters(parameters)
+        db.session.add(message)
+        current_app.logger.info(f"Correo encolado usando la función: {function_name}")
+        return {"success": True, "message": "Correo encolado para envío"}
+        
+    def enqueue_many(self, messages):
+        """
+        Add several messages to the email outbox with a single INSERT.
+        
+        Like enqueue, the rows are persisted by the caller's commit.
+        
+        Args:
+            messages: List of (function_name, parameters) tuples
+            
+        Returns:
+            List of dictionaries with success status and message
+        """
+        from app import db
+        from app.models.email_outbox import EmailOutbox
+        from sqlalchemy import insert
+        
+        if messages:
+            db.session.execute(insert(EmailOutbox), [
+                {"function_name": function_name, "parameters": json.dumps(parameters)}
+                for function_name, parameters in messages
+            ])
+            current_app.logger.info(f"{len(messages)} correos encolados en un lote")
+        return [{"success": True, "message": "Correo encolado para envío"} for _ in messages]
+        
+    def _post(self, payload):
+        """
+        POST an authenticated payload to the Google Apps Script web app.
+        
+        Args:
+            payload: JSON-serializable dictionary; the security token is added here
+            
+        Returns:
+            Tuple (response_data, error_msg); exactly one of them is None
+        """
         if not self.deployment_url:
             error_msg = "GAS_DEPLOYMENT_URL no configurada. Revise su archivo .env."
             current_app.logger.error(error_msg)
-            return {"success": False, "message": error_msg}
-            
-        try:
-            current_app.logger.info(f"Intentando enviar correo usando la función: {function_name}")
-            current_app.logger.debug(f"Parámetros del correo: {parameters}")
+            return None, error_msg
             
-            payload = {
-                "function": function_name,
-                "parameters": parameters,
-                "token": current_app.config.get('GOOGLE_DRIVE_SECURE_TOKEN')
-            }
-            
-            if not payload["token"]:
-                error_msg = "GOOGLE_DRIVE_SECURE_TOKEN no configurado. Revise su archivo .env."
-                current_app.logger.error(error_msg)
-                return {"success": False, "message": error_msg}
+        payload["token"] = current_app.config.get('GOOGLE_DRIVE_SECURE_TOKEN')
+        if not payload["token"]:
+            error_msg = "GOOGLE_DRIVE_SECURE_TOKEN no configurado. Revise su archivo .env."
+            current_app.logger.error(error_msg)
+            return None, error_msg
+
+        # Imported here so that requests is only loaded by processes that send email
+        import requests
+        from app.utils.gas_transport import get_transport, CircuitOpenError
             
-            current_app.logger.info(f"Making request to: {self.deployment_url}")
-            response = requests.post(self.deployment_url, json=payload)
+        try:
+            current_app.logger.debug("Making request to: %s", self.deployment_url)
+            response = get_transport().post(self.deployment_url, payload)
             
-            if response.status_code == 200:
-                try:
-                    response_data = response.json()
-                    if response_data.get('success'):
-                        current_app.logger.info(f"Correo enviado exitosamente usando {function_name}")
-                        return {"success": True, "message": "Correo enviado exitosamente"}
-                    else:
-                        error_msg = f"Error de GAS: {response_data.get('error', 'Error desconocido')}"
-                        current_app.logger.error(error_msg)
-                        return {"success": False, "message": error_msg}
-                except json.JSONDecodeError:
-                    error_msg = f"Respuesta JSON inválida: {response.text}"
-                    current_app.logger.error(error_msg)
-                    return {"success": False, "message": error_msg}
-            else:
+            if response.status_code != 200:
                 error_msg = f"HTTP {response.status_code}: {response.text}"
                 current_app.logger.error(error_msg)
-                return {"success": False, "message": error_msg}
+                return None, error_msg
+            try:
+                return response.json(), None
+            except json.JSONDecodeError:
+                error_msg = f"Respuesta JSON inválida: {response.text}"
+                current_app.logger.error(error_msg)
+                return None, error_msg
                 
+        except CircuitOpenError as e:
+            error_msg = str(e)
+            current_app.logger.warning(error_msg)
+            return None, error_msg
         except requests.exceptions.RequestException as e:
             error_msg = f"Error de red al enviar correo: {str(e)}"
             current_app.logger.error(error_msg)
             current_app.logger.error(traceback.format_exc())
-            return {"success": False, "message": error_msg}
+            return None, error_msg
         except Exception as e:
             error_msg = f"Error inesperado al enviar correo: {str(e)}"
             current_app.logger.error(error_msg)
             current_app.logger.error(traceback.format_exc())
+            return None, error_msg
+    
+    def _make_request(self, function_name, parameters):
+        """
+        Make an authenticated request to the Google Apps Script web app.
+        
+        Args:
+            function_name: Name of the GAS function to call
+            parameters: List of parameters for the function
+            
+        Returns:
+            Dictionary with success status and message
+        """
+        current_app.logger.info(f"Intentando enviar correo usando la función: {function_name}")
+        current_app.logger.debug("Parámetros del correo: %s", parameters)
+        
+        response_data, error_msg = self._post({
+            "function": function_name,
+            "parameters": parameters
+        })
+        if error_msg:
             return {"success": False, "message": error_msg}
+            
+        # doPost reports success when the function ran, even if the function
+        # itself returned {success: false} (e.g. GmailApp failed)
+        result = response_data.get('result')
+        if isinstance(result, dict) and result.get('success') is False:
+            response_data = result
+        if response_data.get('success'):
+            current_app.logger.info(f"Correo enviado exitosamente usando {function_name}")
+            return {"success": True, "message": "Correo enviado exitosamente"}
+        error_msg = f"Error de GAS: {response_data.get('error', 'Error desconocido')}"
+        current_app.logger.error(error_msg)
+        return {"success": False, "message": error_msg}
+    
+    def send_many(self, messages, batch_size=None):
+        """
+        Send several messages using one GAS invocation per batch.
+        
+        Inside a request they are sent once the request's changes are
+        committed, like single messages.
+        
+        Args:
+            messages: List of (function_name, parameters) tuples
+            batch_size: Maximum number of calls per request. Defaults to the
+                EMAIL_BATCH_SIZE setting.
+        
+        Returns:
+            List of dictionaries with success status and message, in the same
+            order as messages
+        """
+        if self.deferred:
+            return self.enqueue_many(messages)
+        if has_request_context():
+            from app.utils.transactions import after_commit
+            after_commit(lambda: self._deliver_many(messages, batch_size))
+            return [{"success": True, "message": "Correo programado para después de guardar los cambios"}
+                    for _ in messages]
+        return self._deliver_many(messages, batch_size)
+        
+    def _deliver_many(self, messages, batch_size=None):
+        """Send messages to GAS now, in batches; see send_many."""
+        batch_size = batch_size or current_app.config.get('EMAIL_BATCH_SIZE', 25)
+        results = []
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            current_app.logger.info(f"Intentando enviar lote de {len(batch)} correos")
+            response_data, error_msg = self._post({
+                "calls": [{"function": function_name, "parameters": parameters}
+                          for function_name, parameters in batch]
+            })
+            
+            if not error_msg and not response_data.get('success'):
+                error_msg = f"Error de GAS: {response_data.get('error', 'Error desconocido')}"
+                current_app.logger.error(error_msg)
+            if error_msg:
+                results.extend({"success": False, "message": error_msg} for _ in batch)
+                continue
+                
+            items = response_data.get('results') or []
+            for index, (function_name, _) in enumerate(batch):
+                item = items[index] if index < len(items) else {"success": False, "error": "Sin respuesta para este correo"}
+                if item.get('success'):
+                    results.append({"success": True, "message": "Correo enviado exitosamente"})
+                else:
+                    error_msg = f"Error de GAS en {function_name}: {item.get('error', 'Error desconocido')}"
+                    current_app.logger.error(error_msg)
+                    results.append({"success": False, "message": error_msg})
+        return results
     
     def send_ticket_creation_notification(self, user_email, user_name, ticket_id, ticket_description, technician_name):
         """
@@ -97,7 +254,7 @@ class EmailService:
         Returns:
             Dictionary with success status and message
         """
-        return self._make_request("sendTicketCreationNotification", [
+        return self._send("sendTicketCreationNotification", [
             user_email,
             user_name,
             ticket_id,
@@ -121,7 +278,7 @@ class EmailService:
         Returns:
             Dictionary with success status and message
         """
-        return self._make_request("sendTicketStatusUpdateNotification", [
+        return self._send("sendTicketStatusUpdateNotification", [
             user_email,
             user_name,
             ticket_id,
@@ -144,7 +301,7 @@ class EmailService:
         Returns:
             Dictionary with success status and message
         """
-        return self._make_request("sendTechnicianDailySummary", [
+        return self._send("sendTechnicianDailySummary", [
             technician_email,
             technician_name,
             open_tickets,
@@ -165,7 +322,7 @@ class EmailService:
         """
         try:
             current_app.logger.info(f"Intentando enviar correo de configuración de contraseña a {user_email}")
-            result = self._make_request("sendPasswordSetupEmail", [
+            result = self._send("sendPasswordSetupEmail", [
                 user_email,
                 user_name,
                 token
@@ -192,10 +349,28 @@ class EmailService:
         Returns:
             Dictionary with success status and message
         """
-        return self._make_request("sendTicketAssignmentNotification", [
+        return self._send("sendTicketAssignmentNotification", [
             technician_email,
             technician_name,
             ticket_id,
             ticket_description,
             user_name
-        ])
\ No newline at end of file
+        ])
+    
+    def send_bulk_assignment_notification(self, technician_email, technician_name, tickets):
+        """
+        Send one email to a technician listing several tickets assigned at once.
+        
+        Args:
+            technician_email: Email of the technician
+            technician_name: Name of the technician
+            tickets: List of dictionaries with id, description and priority
+            
+        Returns:
+            Dictionary with success status and message
+        """
+        return self._send("sendBulkAssignmentNotification", [
+            technician_email,
+            technician_name,
+            tickets
+        ])
@@ -0,0 +1,138 @@
+import random
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.email_outbox import EmailOutbox
+from app.utils.email_service import EmailService
+from app.utils.sqlite_tuning import PeriodicMaintenance
+
+class EmailWorker:
+    """
+    Background worker that drains the email outbox.
+
+    Request handlers only insert EmailOutbox rows; this worker runs in its own
+    process (``flask email-worker``), delivers pending messages through the
+    Google Apps Script web app and takes care of retries, backoff and moving
+    messages that keep failing to the dead-letter state.
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None, base_delay=None, max_delay=None, lease_seconds=None):
+        config = current_app.config
+        self.batch_size = batch_size or config.get('EMAIL_WORKER_BATCH_SIZE', 20)
+        self.max_attempts = max_attempts or config.get('EMAIL_MAX_ATTEMPTS', 8)
+        self.base_delay = base_delay or config.get('EMAIL_RETRY_BASE_DELAY', 30)
+        self.max_delay = max_delay or config.get('EMAIL_RETRY_MAX_DELAY', 3600)
+        self.lease_seconds = lease_seconds or config.get('EMAIL_WORKER_LEASE', 300)
+        self.email_service = EmailService(deferred=False)
+
+    def _backoff(self, attempts):
+        """Exponential backoff with jitter, in seconds, after the given number of failed attempts."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def release_stale(self):
+        """Return messages claimed by a worker that died mid-send to the pending state."""
+        released = EmailOutbox.query.filter(
+            EmailOutbox.status == EmailOutbox.STATUS_SENDING,
+            EmailOutbox.next_attempt_at < datetime.utcnow()
+        ).update({'status': EmailOutbox.STATUS_PENDING}, synchronize_session=False)
+        db.session.commit()
+        if released:
+            current_app.logger.warning(f"Released {released} stale outbox messages")
+        return released
+
+    def claim_batch(self):
+        """
+        Claim up to batch_size due messages.
+
+        Each row is claimed with a conditional UPDATE so that several workers
+        can drain the same outbox without sending a message twice.
+        """
+        now = datetime.utcnow()
+        candidates = db.session.query(EmailOutbox.id).filter(
+            EmailOutbox.status == EmailOutbox.STATUS_PENDING,
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(self.batch_size).all()
+
+        claimed = []
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        for (message_id,) in candidates:
+            updated = EmailOutbox.query.filter_by(
+                id=message_id,
+                status=EmailOutbox.STATUS_PENDING
+            ).update({'status': EmailOutbox.STATUS_SENDING, 'next_attempt_at': lease_until},
+                     synchronize_session=False)
+            if updated:
+                claimed.append(message_id)
+        db.session.commit()
+
+        if not claimed:
+            return []
+        return EmailOutbox.query.filter(EmailOutbox.id.in_(claimed)).order_by(EmailOutbox.id).all()
+
+    def _record_result(self, message, result):
+        message.attempts += 1
+        if result["success"]:
+            message.status = EmailOutbox.STATUS_SENT
+            message.sent_at = datetime.utcnow()
+            message.last_error = None
+        elif message.attempts >= self.max_attempts:
+            message.status = EmailOutbox.STATUS_DEAD
+            message.last_error = result["message"]
+            current_app.logger.error(
+                f"Outbox message {message.id} ({message.function_name}) moved to dead-letter "
+                f"after {message.attempts} attempts: {result['message']}")
+        else:
+            delay = self._backoff(message.attempts)
+            message.status = EmailOutbox.STATUS_PENDING
+            message.last_error = result["message"]
+            message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            current_app.logger.warning(
+                f"Outbox message {message.id} failed (attempt {message.attempts}), "
+                f"retrying in {int(delay)}s: {result['message']}")
+
+    def process_batch(self):
+        """Deliver one batch of due messages. Returns the number of messages processed."""
+        messages = self.claim_batch()
+        if not messages:
+            return 0
+        results = self.email_service.send_many(
+            [(message.function_name, message.get_parameters()) for message in messages])
+        for message, result in zip(messages, results):
+            self._record_result(message, result)
+        db.session.commit()
+        return len(messages)
+
+    def run(self, poll_interval=None, once=False):
+        """
+        Drain the outbox until interrupted.
+
+        Args:
+            poll_interval: Seconds to sleep when the outbox is empty
+            once: If True, process what is currently due and return
+        """
+        poll_interval = poll_interval or current_app.config.get('EMAIL_WORKER_POLL_INTERVAL', 5)
+        # The worker is the one long-running process, so it also keeps SQLite tidy
+        maintenance = PeriodicMaintenance(db.engine, current_app.config.get('SQLITE_MAINTENANCE_INTERVAL'),
+                                          current_app.logger)
+        current_app.logger.info("Email worker started")
+        self.release_stale()
+        while True:
+            processed = self.process_batch()
+            if once and not processed:
+                break
+            if not processed:
+                self.release_stale()
+                maintenance.run_if_due()
+                time.sleep(poll_interval)
+
+    def retry_dead(self):
+        """Move every dead-letter message back to the pending state."""
+        revived = EmailOutbox.query.filter_by(status=EmailOutbox.STATUS_DEAD).update({
+            'status': EmailOutbox.STATUS_PENDING,
+            'attempts': 0,
+            'next_attempt_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        return revived
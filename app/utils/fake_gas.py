@@ -0,0 +1,205 @@
+import collections
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Functions app.gs exposes to doPost and the parameters each one takes
+FUNCTIONS = {
+    'sendEmail': ('to', 'subject', 'htmlBody', 'senderName', 'placeholders'),
+    'sendTicketCreationNotification': ('userEmail', 'userName', 'ticketId', 'ticketDescription', 'technicianName'),
+    'sendTicketAssignmentNotification': ('technicianEmail', 'technicianName', 'ticketId', 'ticketDescription', 'userName'),
+    'sendBulkAssignmentNotification': ('technicianEmail', 'technicianName', 'tickets'),
+    'sendTicketStatusUpdateNotification': ('userEmail', 'userName', 'ticketId', 'ticketDescription', 'status',
+                                           'technicianName', 'solution'),
+    'sendTechnicianDailySummary': ('technicianEmail', 'technicianName', 'openTickets', 'closedToday'),
+    'sendPasswordSetupEmail': ('userEmail', 'userName', 'token'),
+}
+
+class FakeGasServer:
+    """
+    Local stand-in for the Google Apps Script web app in app.gs.
+
+    Answers doGet and doPost like the deployed script: checks the token,
+    dispatches single calls and {"calls": [...]} batches to the functions
+    app.gs defines and replies {success, result|results|error} with HTTP
+    200. Instead of sending email it records the calls it received.
+
+    Faults are injected at random, with the given probabilities:
+    error_rate fails a call the way a GmailApp error does, quota_rate
+    answers a whole request with HTTP 429, and timeout_rate runs the calls
+    but holds the response for timeout_seconds, like a deployment that
+    sent the email but answered too late.
+
+    Args:
+        token: Token requests must carry (GOOGLE_DRIVE_SECURE_TOKEN)
+        host, port: Address to listen on; port 0 picks a free one
+        latency: Seconds every request takes
+        call_latency: Extra seconds per call, as a batch takes longer
+        jitter: Up to this many extra seconds, at random, per request
+        error_rate, quota_rate, timeout_rate: Fault probabilities, 0 to 1
+        timeout_seconds: How long a timed-out request is held
+        retry_after: Seconds announced in the Retry-After header of 429s
+        seed: Random seed, for reproducible faults
+    """
+
+    def __init__(self, token, host='127.0.0.1', port=0, latency=0.0, call_latency=0.0, jitter=0.0,
+                 error_rate=0.0, quota_rate=0.0, timeout_rate=0.0, timeout_seconds=35.0,
+                 retry_after=1, seed=None):
+        self.token = token
+        self.latency = latency
+        self.call_latency = call_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = collections.Counter()
+        # Most recent calls that "sent" an email, as (function, parameters)
+        self.delivered = collections.deque(maxlen=1000)
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; don't let Nagle hold the body
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._reply(200, {'status': 'ok', 'message': 'Email service is running'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                status, body, delay = fake.handle(self.rfile.read(length))
+                if delay:
+                    time.sleep(delay)
+                headers = {'Retry-After': str(fake.retry_after)} if status == 429 else {}
+                self._reply(status, body, headers)
+
+            def _reply(self, status, body, headers=None):
+                data = json.dumps(body).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    for name, value in (headers or {}).items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting, as it does on a timeout
+                    pass
+
+            def log_message(self, format, *args):
+                logger.debug("fake GAS: " + format, *args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """URL to use as GAS_DEPLOYMENT_URL."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/exec"
+
+    def _count(self, *keys):
+        with self._lock:
+            for key in keys:
+                self.stats[key] += 1
+
+    def _chance(self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _call(self, function_name, parameters):
+        """Run one function the way app.gs does and return what it would."""
+        if function_name not in FUNCTIONS:
+            raise ValueError(f"Unknown function: {function_name}")
+        parameters = list(parameters or [])
+        if function_name == 'sendTicketStatusUpdateNotification' and parameters[4:5] != ['Cerrado']:
+            return {'success': True, 'message': 'Not a closed ticket, no email needed'}
+        if self._chance(self.error_rate):
+            self._count('failed')
+            return {'success': False, 'error': 'Simulated GmailApp failure'}
+        self._count('delivered')
+        with self._lock:
+            self.delivered.append((function_name, parameters))
+        return {'success': True, 'to': parameters[0] if parameters else None}
+
+    def _call_isolated(self, call):
+        # callFunction in app.gs: each call of a batch reports its own error
+        try:
+            result = self._call(call.get('function'), call.get('parameters'))
+        except ValueError as e:
+            return {'success': False, 'error': f"Error: {e}"}
+        if result.get('success') is False:
+            return {'success': False, 'error': result.get('error') or 'Unknown error'}
+        return {'success': True, 'result': result}
+
+    def handle(self, raw_body):
+        """
+        Answer one POST body.
+
+        Returns:
+            Tuple (HTTP status, JSON body, seconds to wait before answering)
+        """
+        self._count('requests')
+        if self._chance(self.quota_rate):
+            self._count('quota')
+            return 429, {'success': False, 'error': 'Service invoked too many times in a short time'}, 0
+        try:
+            data = json.loads(raw_body or b'{}')
+            if data.get('token') != self.token:
+                self._count('rejected')
+                return 200, {'success': False, 'error': 'Invalid security token'}, 0
+
+            if isinstance(data.get('calls'), list):
+                calls = data['calls']
+                body = {'success': True, 'results': [self._call_isolated(call) for call in calls]}
+            else:
+                calls = [data]
+                body = {'success': True, 'result': self._call(data.get('function'), data.get('parameters'))}
+        except (ValueError, AttributeError, TypeError) as e:
+            # doPost's catch: malformed JSON, unknown function
+            self._count('errors')
+            return 200, {'success': False, 'error': f"Error: {e}"}, 0
+
+        with self._lock:
+            self.stats['calls'] += len(calls)
+            delay = self.latency + self.call_latency * len(calls) + self._random.uniform(0, self.jitter)
+        if self._chance(self.timeout_rate):
+            self._count('timeouts')
+            delay = max(delay, self.timeout_seconds)
+        return 200, body, delay
+
+    def start(self):
+        """Serve from a daemon thread; returns the server."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-gas', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from app.utils.metrics import record_gas_call
+
+# Responses that mean GAS did not run the request, so sending it again
+# cannot deliver an email twice
+RETRY_STATUSES = {429, 503}
+# Responses that count against the circuit but are not retried: the script
+# may have sent some or all of the emails before failing
+FAILURE_STATUSES = {500, 502, 504}
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker rejects a call without contacting GAS."""
+    pass
+
+class CircuitBreaker:
+    """
+    Simple thread-safe circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and every
+    call fails fast for reset_timeout seconds. Then a single trial call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class GasTransport:
+    """
+    Process-wide HTTP transport to the Google Apps Script web app.
+
+    Keeps a pooled keep-alive session, applies connect/read timeouts, retries
+    429/503 responses and connection failures with jittered exponential
+    backoff and stops calling GAS altogether while the circuit is open.
+    Read timeouts and other 5xx responses are not retried: GAS may already
+    have sent the email.
+    """
+
+    def __init__(self, connect_timeout=5, read_timeout=30, max_retries=2, backoff_base=0.5,
+                 backoff_max=8, pool_size=10, failure_threshold=5, reset_timeout=60):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _sleep_before_retry(self, attempt, response=None):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            delay = min(self.backoff_max, int(response.headers['Retry-After']))
+        time.sleep(delay)
+
+    def post(self, url, payload):
+        """
+        POST a JSON payload, retrying transient failures.
+
+        Returns:
+            The last requests.Response received
+
+        Raises:
+            CircuitOpenError: GAS has been failing and the circuit is open
+            requests.exceptions.RequestException: the request could not be completed
+        """
+        started = time.perf_counter()
+        try:
+            return self._post(url, payload)
+        finally:
+            record_gas_call(time.perf_counter() - started)
+
+    def _post(self, url, payload):
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError("Servicio de correo no disponible temporalmente (circuito abierto)")
+            last_attempt = attempt == self.max_retries
+
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.exceptions.ReadTimeout:
+                self.breaker.record_failure()
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.breaker.record_failure()
+                if last_attempt:
+                    raise
+                self._sleep_before_retry(attempt)
+                continue
+            except Exception:
+                # Any other error must also end a half-open trial, or the
+                # circuit would stay half-open and refuse every later send
+                self.breaker.record_failure()
+                raise
+
+            if response.status_code in RETRY_STATUSES:
+                self.breaker.record_failure()
+                if last_attempt:
+                    return response
+                current_app.logger.warning(
+                    f"GAS respondió HTTP {response.status_code}, reintentando (intento {attempt + 1})")
+                self._sleep_before_retry(attempt, response)
+                continue
+            if response.status_code in FAILURE_STATUSES:
+                self.breaker.record_failure()
+                return response
+
+            self.breaker.record_success()
+            return response
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+def get_transport():
+    """Return the transport shared by every EmailService in this process."""
+    config = current_app.config
+    key = id(current_app._get_current_object())
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = GasTransport(
+                connect_timeout=config.get('GAS_CONNECT_TIMEOUT', 5),
+                read_timeout=config.get('GAS_READ_TIMEOUT', 30),
+                max_retries=config.get('GAS_MAX_RETRIES', 2),
+                backoff_base=config.get('GAS_RETRY_BACKOFF', 0.5),
+                backoff_max=config.get('GAS_RETRY_BACKOFF_MAX', 8),
+                pool_size=config.get('GAS_POOL_SIZE', 10),
+                failure_threshold=config.get('GAS_CIRCUIT_FAILURE_THRESHOLD', 5),
+                reset_timeout=config.get('GAS_CIRCUIT_RESET_TIMEOUT', 60)
+            )
+            _transports[key] = transport
+        return transport
+
+def reset_transports():
+    """Forget the transports of this process, e.g. in a process forked from one that used them."""
+    with _transports_lock:
+        _transports.clear()
@@ -0,0 +1,90 @@
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import tuple_
+
+def encode_cursor(sort_value, row_id):
+    """Encode the sort key of a row into an opaque URL-safe cursor."""
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        Tuple (sort_value, row_id), or None if the cursor is missing or invalid
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').rsplit('|', 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+class KeysetPage:
+    """
+    One page of a list sorted newest first on (sort_column, id).
+
+    Unlike OFFSET pagination, fetching a page costs the same no matter how
+    deep it is, and rows inserted meanwhile do not shift the page boundaries.
+    The total is optional because counting the whole result is what makes
+    OFFSET pagination expensive; callers pass it when they already have it.
+    """
+
+    def __init__(self, items, sort_attr, has_next, has_prev, total=None):
+        self.items = items
+        self.sort_attr = sort_attr
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.total = total
+
+    def _cursor(self, item):
+        return encode_cursor(getattr(item, self.sort_attr), item.id)
+
+    @property
+    def next_cursor(self):
+        return self._cursor(self.items[-1]) if self.has_next and self.items else None
+
+    @property
+    def prev_cursor(self):
+        return self._cursor(self.items[0]) if self.has_prev and self.items else None
+
+def keyset_paginate(query, sort_column, id_column, per_page, after=None, before=None, total=None):
+    """
+    Fetch one page of query sorted by (sort_column, id_column) descending.
+
+    Args:
+        query: Query to paginate, already filtered
+        sort_column: Column sorted newest first, e.g. Ticket.created_at
+        id_column: Unique tie-breaker column, e.g. Ticket.id
+        per_page: Number of rows per page
+        after: Cursor of the last row of the previous page (go forward)
+        before: Cursor of the first row of the next page (go back)
+        total: Optional total number of rows, shown by the pagination component
+
+    Returns:
+        KeysetPage
+    """
+    key = tuple_(sort_column, id_column)
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before) if not after_key else None
+
+    if before_key:
+        # Walk backwards in ascending order and flip the rows back
+        rows = query.filter(key > tuple_(*before_key)).order_by(
+            sort_column.asc(), id_column.asc()).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        if after_key:
+            query = query.filter(key < tuple_(*after_key))
+        rows = query.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = after_key is not None
+
+    return KeysetPage(items, sort_column.key, has_next, has_prev, total)
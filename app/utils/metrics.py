@@ -0,0 +1,218 @@
+import threading
+import time
+from flask import current_app, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request totals kept in g while the request runs
+_REQUEST_FIELDS = ('sql_count', 'sql_seconds', 'gas_count', 'gas_seconds', 'template_seconds')
+
+class _EndpointStats:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.statuses = {}
+        self.totals = dict.fromkeys(_REQUEST_FIELDS, 0)
+
+class Metrics:
+    """
+    Request metrics of this process, by endpoint.
+
+    Each worker process keeps its own; a scraper sees the worker that
+    answered. Recording a request takes one lock and a few additions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.started_at = time.time()
+
+    def record(self, endpoint, method, status, seconds, totals):
+        with self._lock:
+            stats = self._endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self._endpoints[(endpoint, method)] = _EndpointStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[index] += 1
+                    break
+            for field in _REQUEST_FIELDS:
+                stats.totals[field] += totals[field]
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted(
+                ((endpoint, method, stats.count, stats.seconds, list(stats.buckets),
+                  dict(stats.statuses), dict(stats.totals))
+                 for (endpoint, method), stats in self._endpoints.items()),
+                key=lambda item: (item[0], item[1]))
+
+    def prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, text):
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        snapshot = self._snapshot()
+        family('helpdesk_http_requests_total', 'counter', 'Requests handled, by endpoint, method and status.')
+        for endpoint, method, _, _, _, statuses, _ in snapshot:
+            for status, count in sorted(statuses.items()):
+                lines.append(f'helpdesk_http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        family('helpdesk_http_request_duration_seconds', 'histogram', 'Time to produce the response, by endpoint.')
+        for endpoint, method, count, seconds, buckets, _, _ in snapshot:
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(f'helpdesk_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'helpdesk_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'helpdesk_http_request_duration_seconds_sum{{{labels}}} {seconds:.6f}')
+            lines.append(f'helpdesk_http_request_duration_seconds_count{{{labels}}} {count}')
+
+        for field, name, text in (
+            ('sql_count', 'helpdesk_sql_statements_total', 'SQL statements executed while handling requests.'),
+            ('sql_seconds', 'helpdesk_sql_seconds_total', 'Time spent executing SQL statements.'),
+            ('gas_count', 'helpdesk_gas_calls_total', 'Calls to the Google Apps Script web app.'),
+            ('gas_seconds', 'helpdesk_gas_seconds_total', 'Time spent calling the Google Apps Script web app.'),
+            ('template_seconds', 'helpdesk_template_render_seconds_total', 'Time spent rendering templates.'),
+        ):
+            family(name, 'counter', text)
+            for endpoint, method, _, _, _, _, totals in snapshot:
+                value = totals[field]
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{endpoint="{endpoint}",method="{method}"}} {value}')
+
+        family('helpdesk_process_start_time_seconds', 'gauge', 'Start time of the process since the Unix epoch.')
+        lines.append(f'helpdesk_process_start_time_seconds {self.started_at:.0f}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, limit=10):
+        """
+        Per-endpoint averages for the admin dashboard, slowest total time first.
+
+        Returns:
+            List of dictionaries with endpoint, method, requests, average and
+            approximate 95th percentile latency in ms, and per-request
+            averages of SQL statements, SQL ms, GAS calls and template ms
+        """
+        rows = []
+        for endpoint, method, count, seconds, buckets, _, totals in self._snapshot():
+            if not count:
+                continue
+            # Upper bound of the bucket holding the 95th percentile
+            p95 = None
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                cumulative += bucket
+                if cumulative >= 0.95 * count:
+                    p95 = bound * 1000
+                    break
+            rows.append({
+                'endpoint': endpoint,
+                'method': method,
+                'requests': count,
+                'total_seconds': seconds,
+                'avg_ms': seconds / count * 1000,
+                'p95_ms': p95,
+                'sql_count': totals['sql_count'] / count,
+                'sql_ms': totals['sql_seconds'] / count * 1000,
+                'gas_count': totals['gas_count'] / count,
+                'template_ms': totals['template_seconds'] / count * 1000,
+            })
+        rows.sort(key=lambda row: row['total_seconds'], reverse=True)
+        return rows[:limit]
+
+def get_metrics():
+    """Metrics of the current application."""
+    return current_app.extensions.setdefault('helpdesk_metrics', Metrics())
+
+def _request_totals():
+    """Totals of the request being handled, or None outside a measured request."""
+    if has_request_context():
+        return g.get('_metrics')
+    return None
+
+def record_gas_call(seconds):
+    """Count a call to the Google Apps Script web app against the current request."""
+    totals = _request_totals()
+    if totals is not None:
+        totals['gas_count'] += 1
+        totals['gas_seconds'] += seconds
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_totals() is not None:
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    totals = _request_totals()
+    started = conn.info.get('_metrics_started')
+    if totals is not None and started:
+        totals['sql_count'] += 1
+        totals['sql_seconds'] += time.perf_counter() - started.pop()
+
+def _handle_error(context):
+    started = context.connection.info.get('_metrics_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+def _before_render(sender, template, context, **extra):
+    if _request_totals() is not None:
+        g.setdefault('_template_started', []).append(time.perf_counter())
+
+def _rendered(sender, template, context, **extra):
+    totals = _request_totals()
+    started = g.get('_template_started') if totals is not None else None
+    if started:
+        elapsed = time.perf_counter() - started.pop()
+        # Templates rendered inside another one are already part of its time
+        if not started:
+            totals['template_seconds'] += elapsed
+
+_listening = False
+
+def init_metrics(app):
+    """
+    Measure every request of the application.
+
+    Latency, SQL statements, GAS calls and template rendering are collected
+    through Flask request hooks and signals and SQLAlchemy engine events, so
+    views do not need to do anything. Streamed responses keep their request
+    open until the last chunk, so their latency covers the whole transfer.
+    """
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listening = True
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics = dict.fromkeys(_REQUEST_FIELDS, 0)
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def response_status_metrics(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request_metrics(exc):
+        totals = g.pop('_metrics', None)
+        if totals is None:
+            return
+        seconds = time.perf_counter() - g._metrics_started
+        status = g.get('_metrics_status', 500)
+        get_metrics().record(request.endpoint or 'unmatched', request.method, status, seconds, totals)
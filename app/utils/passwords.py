@@ -0,0 +1,68 @@
+import time
+from flask import current_app
+
+# bcrypt is imported where it is used: only login and password changes need it
+
+# bcrypt's own default; each extra round doubles the hashing time
+DEFAULT_BCRYPT_ROUNDS = 12
+
+def bcrypt_rounds():
+    """Work factor new password hashes are created with (BCRYPT_ROUNDS)."""
+    return current_app.config.get('BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS)
+
+def hash_cost(password_hash):
+    """
+    Work factor a stored hash was created with.
+
+    Hashes look like $2b$12$<salt and digest>; the number between the
+    second and third '$' is the cost.
+
+    Returns:
+        The cost as an integer, or None if the hash is not a bcrypt hash
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def hash_password(password, rounds=None):
+    """Hash a password with the configured work factor."""
+    import bcrypt
+    salt = bcrypt.gensalt(rounds or bcrypt_rounds())
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def verify_password(password_hash, password):
+    """
+    Check a password against a stored hash and time the check.
+
+    The check costs as much as the stored hash's work factor, so the time is
+    logged with it to size BCRYPT_ROUNDS against the CPU available per worker.
+
+    Returns:
+        Tuple (valid, needs_rehash): needs_rehash is True when the password is
+        valid but the hash was made with a different work factor than the
+        configured one
+    """
+    if not password_hash or not password:
+        return False, False
+    import bcrypt
+    start = time.perf_counter()
+    try:
+        valid = bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        current_app.logger.warning("Stored password hash is not a valid bcrypt hash")
+        return False, False
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    cost = hash_cost(password_hash)
+    current_app.logger.info(f"Password check: bcrypt cost {cost}, {elapsed_ms:.0f} ms")
+    return valid, valid and cost != bcrypt_rounds()
+
+def benchmark_rounds(rounds, samples=3):
+    """Median seconds it takes to hash a password with the given work factor."""
+    import bcrypt
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'benchmark-password', bcrypt.gensalt(rounds))
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
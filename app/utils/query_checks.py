@@ -0,0 +1,118 @@
+import re
+from sqlalchemy import text
+from app import db
+from app.models.user import User
+from app.models.technician import Technician
+from app.utils.query_counter import assert_max_queries, count_queries
+from app.utils.registry import get_registry
+from app.utils.ticket_counters import counters_available
+
+# Maximum SQL statements per view. The numbers must not depend on how many
+# rows are on the page: a view that lazy-loads a relationship per row breaks them.
+QUERY_BUDGETS = [
+    # (endpoint URL, role, max queries)
+    ('/admin/dashboard', 'admin', 2),
+    ('/tickets', 'admin', 2),
+    ('/tickets', 'user', 2),
+    ('/technician/dashboard', 'technician', 2),
+]
+
+# Views whose queries must be answered from indexes, including filtered variants
+QUERY_PLAN_VIEWS = [
+    ('/admin/dashboard', 'admin'),
+    ('/admin/dashboard?status=Abierto', 'admin'),
+    ('/admin/dashboard?technician=1', 'admin'),
+    ('/tickets', 'admin'),
+    ('/tickets', 'user'),
+    ('/technician/dashboard', 'technician'),
+    ('/technician/dashboard?section=in_progress', 'technician'),
+    ('/technician/dashboard?section=closed', 'technician'),
+]
+
+# Tables large enough that reading them end to end is a bug
+LARGE_TABLES = ('tickets', 'users', 'email_outbox')
+
+# "SCAN tickets" is a full scan; "SCAN tickets USING INDEX ..." walks an index in order
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+def _login(client, role):
+    """Put an account of the given role in the test client's session."""
+    if role == 'technician':
+        account = Technician.query.first()
+        if not account:
+            return False
+        values = {'user_id': account.id, 'user_role': 'technician',
+                  'technical_profile': account.technical_profile, 'user_name': account.name}
+    else:
+        account = User.query.filter_by(role=role).first()
+        if not account:
+            return False
+        values = {'user_id': account.id, 'user_role': role,
+                  'user_name': f"{account.nombre} {account.apellido}"}
+    with client.session_transaction() as session:
+        session.clear()
+        session.update(values)
+    return True
+
+def check_query_budgets(app, budgets=QUERY_BUDGETS):
+    """
+    Render every view in budgets with the test client and check its query count.
+
+    The budgets are per request, so the in-process caches, which a running
+    worker has already filled, are loaded before counting.
+
+    Returns:
+        List of failure messages; empty when every view is within budget
+    """
+    get_registry().departments()
+    counters_available()
+    failures = []
+    client = app.test_client()
+    for url, role, max_queries in budgets:
+        if not _login(client, role):
+            failures.append(f"{url} ({role}): no hay una cuenta con ese rol para probar")
+            continue
+        try:
+            with assert_max_queries(max_queries, f"{url} ({role})"):
+                response = client.get(url)
+            if response.status_code != 200:
+                failures.append(f"{url} ({role}): HTTP {response.status_code}")
+        except AssertionError as e:
+            failures.append(str(e))
+    return failures
+
+def _full_scans(statement, parameters):
+    """Return the large tables read with a full scan by one statement."""
+    with db.engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    scans = []
+    for row in plan:
+        match = _FULL_SCAN.match(row[-1])
+        if match and match.group(1) in LARGE_TABLES:
+            scans.append(row[-1])
+    return scans
+
+def check_query_plans(app, views=QUERY_PLAN_VIEWS):
+    """
+    Run EXPLAIN QUERY PLAN on every SELECT issued by the views.
+
+    Returns:
+        List of failure messages for statements that fully scan a large table
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return ["EXPLAIN QUERY PLAN solo está soportado en SQLite"]
+
+    failures = []
+    client = app.test_client()
+    for url, role in views:
+        if not _login(client, role):
+            failures.append(f"{url} ({role}): no hay una cuenta con ese rol para probar")
+            continue
+        with count_queries() as counter:
+            client.get(url)
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            for scan in _full_scans(statement, parameters):
+                failures.append(f"{url} ({role}): {scan}\n  {statement}")
+    return failures
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+class QueryCounter:
+    """Collects the SQL statements executed while it is active."""
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+@contextmanager
+def count_queries():
+    """
+    Count the SQL statements executed inside the block.
+
+    Usage:
+        with count_queries() as counter:
+            client.get('/admin/dashboard')
+        print(counter.count)
+    """
+    counter = QueryCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', counter._before_cursor_execute)
+
+@contextmanager
+def assert_max_queries(max_queries, label=''):
+    """
+    Fail with AssertionError if the block executes more than max_queries statements.
+
+    Usage:
+        with assert_max_queries(8, 'admin.dashboard'):
+            client.get('/admin/dashboard')
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = '\n'.join(f'  {statement}' for statement in counter.statements)
+        raise AssertionError(
+            f"{label or 'block'} executed {counter.count} queries (max {max_queries}):\n{statements}")
@@ -0,0 +1,139 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.technician import Technician
+from app.models.category import TicketCategory
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.utils.ticket_distributor import TicketDistributor, create_strategy, parse_weights
+
+# Ticket statuses that count as open work for the assignment strategies
+OPEN_STATUSES = ('Abierto', 'En Proceso')
+
+class Registry:
+    """
+    In-process cache of technicians, ticket categories and user departments.
+
+    Ticket creation reads technicians grouped by technical profile and the
+    active categories on every request, and the dashboards list the
+    departments in their filters, while they only change from the admin and
+    registration pages. The admin routes call invalidate() after writing and
+    registration calls add_department(); entries also
+    expire after REGISTRY_TTL seconds so that other worker processes, which
+    do not see that call, pick the changes up. Reloading also resets the
+    assignment strategy's view of each technician's open tickets; the
+    weighted round robin keeps its place in the rotation.
+
+    Entries are plain dictionaries, not ORM objects, so they can be shared
+    between requests and threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._technicians = {}
+        self._by_profile = {}
+        self._categories = {}
+        self._departments = []
+        self._distributor = None
+
+    def invalidate(self):
+        """Drop the cached data; the next read reloads it from the database."""
+        with self._lock:
+            self._loaded_at = None
+
+    def _load(self):
+        technicians = {}
+        by_profile = {}
+        for t in Technician.query.all():
+            entry = {'id': t.id, 'name': t.name, 'email': t.email,
+                     'profile': t.technical_profile, 'active': t.active}
+            technicians[t.id] = entry
+            # Only active technicians receive new tickets
+            if t.active:
+                by_profile.setdefault(t.technical_profile, []).append(entry)
+        categories = {
+            c.id: {'id': c.id, 'name': c.name, 'description': c.description,
+                   'technical_profile': c.technical_profile, 'active': bool(c.active)}
+            for c in TicketCategory.query.order_by(TicketCategory.id).all()
+        }
+        departments = [d for d, in db.session.query(User.departamento).filter(
+            User.departamento.isnot(None)).distinct().order_by(User.departamento) if d]
+        # Open tickets per technician and priority, the starting point for the
+        # assignment strategy, which then tracks changes in memory
+        workload = {}
+        rows = db.session.query(Ticket.technician_id, Ticket.priority, func.count(Ticket.id)).filter(
+            Ticket.status.in_(OPEN_STATUSES),
+            Ticket.technician_id.isnot(None)
+        ).group_by(Ticket.technician_id, Ticket.priority).all()
+        for technician_id, priority, count in rows:
+            workload.setdefault(technician_id, {})[priority] = count
+        strategy = create_strategy(
+            current_app.config.get('ASSIGNMENT_STRATEGY', 'least_open'),
+            by_profile,
+            workload,
+            parse_weights(current_app.config.get('ASSIGNMENT_WEIGHTS')),
+            previous=self._distributor.strategy if self._distributor else None
+        )
+        self._technicians = technicians
+        self._by_profile = by_profile
+        self._categories = categories
+        self._departments = departments
+        self._distributor = TicketDistributor(by_profile, strategy)
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        ttl = current_app.config.get('REGISTRY_TTL', 60)
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > ttl:
+                self._load()
+
+    def technicians_by_profile(self):
+        """Dictionary technical profile -> list of active technician entries."""
+        self._ensure_loaded()
+        return self._by_profile
+
+    def distributor(self):
+        """TicketDistributor using the configured assignment strategy."""
+        self._ensure_loaded()
+        return self._distributor
+
+    def technicians(self):
+        """Every technician entry, active or not, in id order."""
+        self._ensure_loaded()
+        return sorted(self._technicians.values(), key=lambda t: t['id'])
+
+    def technician(self, technician_id):
+        """Technician entry with the given id, or None."""
+        self._ensure_loaded()
+        return self._technicians.get(technician_id)
+
+    def category(self, category_id):
+        """Category entry with the given id, or None. Includes inactive categories."""
+        self._ensure_loaded()
+        try:
+            return self._categories.get(int(category_id))
+        except (TypeError, ValueError):
+            return None
+
+    def active_categories(self):
+        """Active category entries, in creation order."""
+        self._ensure_loaded()
+        return [c for c in self._categories.values() if c['active']]
+
+    def departments(self):
+        """Departments users belong to, sorted, for the filter dropdowns."""
+        self._ensure_loaded()
+        return self._departments
+
+    def add_department(self, department):
+        """Add a department a new user registered with, without reloading."""
+        with self._lock:
+            if department and department not in self._departments:
+                self._departments = sorted(self._departments + [department])
+
+def get_registry():
+    """Registry of the current application."""
+    return current_app.extensions.setdefault('helpdesk_registry', Registry())
@@ -0,0 +1,259 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, event, select, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+# PRAGMAs run on every new connection, in order. busy_timeout comes first so
+# that switching to WAL waits for other connections instead of failing.
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, readers block the writer
+    'default': {},
+    # Readers and the writer work concurrently; a commit waits for the WAL
+    # write but not for fsync, which happens at checkpoints
+    'production': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # negative: KiB, i.e. 64 MiB per connection
+        'temp_store': 'MEMORY',
+        'journal_size_limit': 64 * 1024 * 1024,  # WAL file size kept after a checkpoint
+    },
+}
+
+def sqlite_pragmas(profile, overrides=''):
+    """
+    PRAGMAs of a profile with the SQLITE_PRAGMAS overrides applied.
+
+    Args:
+        profile: Name of a profile in SQLITE_PROFILES
+        overrides: "name=value,name=value"; an empty value removes the PRAGMA
+
+    Raises:
+        ValueError: If the profile does not exist
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Perfil de SQLite desconocido: {profile} (use {', '.join(SQLITE_PROFILES)})")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for item in (overrides or '').split(','):
+        name, _, value = item.strip().partition('=')
+        if not name.strip():
+            continue
+        if value.strip():
+            pragmas[name.strip()] = value.strip()
+        else:
+            pragmas.pop(name.strip(), None)
+    return pragmas
+
+def apply_pragmas(engine, pragmas):
+    """Run the PRAGMAs on every connection the engine opens. Does nothing on other databases."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+def configure_sqlite(app, engine):
+    """Apply the configured SQLITE_PROFILE and SQLITE_PRAGMAS to the application's engine."""
+    apply_pragmas(engine, sqlite_pragmas(app.config['SQLITE_PROFILE'], app.config['SQLITE_PRAGMAS']))
+
+def run_maintenance(engine):
+    """
+    Refresh the query planner statistics and checkpoint the WAL.
+
+    PRAGMA optimize only analyzes tables whose statistics are stale, so it
+    is cheap when there is nothing to do. The TRUNCATE checkpoint copies the
+    WAL back into the database and shrinks it; it waits for readers up to
+    busy_timeout and reports busy if they kept it from finishing.
+
+    Returns:
+        Dictionary with the journal mode, the checkpoint result (busy, WAL
+        pages, pages checkpointed; None outside WAL) and the seconds it took
+    """
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        conn.exec_driver_sql("PRAGMA optimize")
+        checkpoint = None
+        if journal_mode == 'wal':
+            checkpoint = tuple(conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one())
+        conn.commit()
+    return {'journal_mode': journal_mode, 'checkpoint': checkpoint, 'seconds': time.perf_counter() - started}
+
+class PeriodicMaintenance:
+    """Run run_maintenance at most once per interval, from a long-running loop."""
+
+    def __init__(self, engine, interval, logger):
+        self.engine = engine
+        self.interval = interval
+        self.logger = logger
+        self.last_run = time.monotonic()
+
+    def run_if_due(self):
+        if self.engine.dialect.name != 'sqlite' or not self.interval:
+            return None
+        if time.monotonic() - self.last_run < self.interval:
+            return None
+        self.last_run = time.monotonic()
+        try:
+            result = run_maintenance(self.engine)
+        except OperationalError as e:
+            self.logger.warning(f"SQLite maintenance failed: {e}")
+            return None
+        self.logger.info(f"SQLite maintenance: checkpoint {result['checkpoint']}, {result['seconds'] * 1000:.0f} ms")
+        return result
+
+# Stress test
+
+def _create_stress_database(path, tickets):
+    """A database with the application's schema, triggers and some tickets to read."""
+    from app import db
+    from app import models  # noqa: F401 - registers every table on db.metadata
+    from app.models.user import User
+    from app.models.technician import Technician
+    from app.models.category import TicketCategory
+    from app.models.ticket import Ticket
+    from app.utils.ticket_search import FTS_SCHEMA
+    from app.utils.ticket_counters import COUNTER_TRIGGERS
+
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for statement in FTS_SCHEMA + COUNTER_TRIGGERS:
+            conn.execute(text(statement))
+        conn.execute(User.__table__.insert(), [
+            {'dni': f'S{i}', 'apellido': 'Prueba', 'nombre': f'Usuario {i}', 'email': f'u{i}@example.com', 'role': 'user'}
+            for i in range(50)])
+        conn.execute(Technician.__table__.insert(), [
+            {'dni': f'T{i}', 'name': f'Técnico {i}', 'email': f't{i}@example.com',
+             'technical_profile': 'soporte-tecnico', 'active': True} for i in range(5)])
+        conn.execute(TicketCategory.__table__.insert(), {
+            'name': 'Prueba', 'technical_profile': 'soporte-tecnico', 'active': True})
+        conn.execute(Ticket.__table__.insert(), [
+            {'description': f'Ticket existente {i}', 'status': 'Abierto', 'priority': 'media',
+             'user_id': i % 50 + 1, 'technician_id': i % 5 + 1, 'category_id': 1,
+             'profile': 'soporte-tecnico', 'created_at': now, 'updated_at': now} for i in range(tickets)])
+    engine.dispose()
+
+def _stress_engine(path, pragmas):
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    apply_pragmas(engine, pragmas)
+    return engine
+
+def _stress_writer(path, pragmas, writes, number, start, results):
+    """Create tickets like the create view: pick a technician, insert the ticket and its email."""
+    from app.models.ticket import Ticket
+    from app.models.email_outbox import EmailOutbox
+    engine = _stress_engine(path, pragmas)
+    latencies, errors = [], 0
+    with engine.connect() as conn:
+        start.wait()
+        for i in range(writes):
+            begin = time.perf_counter()
+            try:
+                technician_id = conn.execute(
+                    select(Ticket.technician_id).where(Ticket.status == 'Abierto')
+                    .group_by(Ticket.technician_id).order_by(func.count()).limit(1)).scalar()
+                now = datetime.utcnow()
+                conn.execute(Ticket.__table__.insert(), {
+                    'description': f'Prueba de carga {number}-{i}', 'status': 'Abierto', 'priority': 'media',
+                    'user_id': i % 50 + 1, 'technician_id': technician_id, 'category_id': 1,
+                    'profile': 'soporte-tecnico', 'created_at': now, 'updated_at': now})
+                conn.execute(EmailOutbox.__table__.insert(), {
+                    'function_name': 'sendTicketCreationNotification', 'parameters': '[]'})
+                conn.commit()
+                latencies.append(time.perf_counter() - begin)
+            except OperationalError:
+                conn.rollback()
+                errors += 1
+    engine.dispose()
+    results.put(('writer', latencies, errors))
+
+def _stress_reader(path, pragmas, start, stop, results):
+    """List a user's tickets, newest first, until the writers are done."""
+    from app.models.ticket import Ticket
+    engine = _stress_engine(path, pragmas)
+    reads, errors = 0, 0
+    with engine.connect() as conn:
+        start.wait()
+        while not stop.is_set():
+            try:
+                conn.execute(select(Ticket.id, Ticket.description).where(Ticket.user_id == reads % 50 + 1)
+                             .order_by(Ticket.created_at.desc()).limit(20)).all()
+                conn.commit()
+                reads += 1
+            except OperationalError:
+                conn.rollback()
+                errors += 1
+    engine.dispose()
+    results.put(('reader', reads, errors))
+
+def stress_test(profiles=('default', 'production'), writers=4, readers=4, writes=200, tickets=5000, overrides=''):
+    """
+    Measure concurrent ticket creation under each PRAGMA profile.
+
+    For each profile a new temporary database with the application schema,
+    search and counter triggers and `tickets` tickets is hammered by
+    `writers` processes creating `writes` tickets each while `readers`
+    processes list tickets. The application database is not touched.
+    Requires the fork start method (Linux, macOS).
+
+    Returns:
+        Dictionary by profile with writes/s, commit p50/p95 ms, reads/s and
+        the number of operations that failed with "database is locked"
+    """
+    context = multiprocessing.get_context('fork')
+    report = {}
+    for profile in profiles:
+        pragmas = sqlite_pragmas(profile, overrides)
+        directory = tempfile.mkdtemp(prefix='helpdesk-stress-')
+        try:
+            path = os.path.join(directory, 'stress.db')
+            _create_stress_database(path, tickets)
+            start, stop, results = context.Event(), context.Event(), context.Queue()
+            writer_processes = [context.Process(target=_stress_writer, args=(path, pragmas, writes, n, start, results))
+                                for n in range(writers)]
+            reader_processes = [context.Process(target=_stress_reader, args=(path, pragmas, start, stop, results))
+                                for _ in range(readers)]
+            for process in writer_processes + reader_processes:
+                process.start()
+            started = time.perf_counter()
+            start.set()
+
+            latencies, write_errors, reads, read_errors = [], 0, 0, 0
+            for _ in writer_processes:
+                _, writer_latencies, errors = results.get()
+                latencies.extend(writer_latencies)
+                write_errors += errors
+            elapsed = time.perf_counter() - started
+            stop.set()
+            for _ in reader_processes:
+                _, reader_reads, errors = results.get()
+                reads += reader_reads
+                read_errors += errors
+            for process in writer_processes + reader_processes:
+                process.join()
+
+            latencies.sort()
+            report[profile] = {
+                'writes_per_second': len(latencies) / elapsed if elapsed else None,
+                'commit_p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+                'commit_p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None,
+                'reads_per_second': reads / elapsed if elapsed else None,
+                'locked_errors': write_errors + read_errors,
+            }
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+    return report
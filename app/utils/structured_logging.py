@@ -0,0 +1,155 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+# Attributes every LogRecord has; anything else was passed with extra= and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'request_id'}
+
+# Request IDs accepted from the X-Request-ID header
+_REQUEST_ID = re.compile(r'[\w.-]{1,64}')
+
+# The listener of the running application; replaced when create_app is called again
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'location': f"{record.module}:{record.lineno}",
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request ID to records logged in a request."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+class _RequestQueueHandler(QueueHandler):
+    """
+    Put records on the queue for the listener thread.
+
+    Only the cheap part of formatting happens in the calling thread: merging
+    the message arguments and rendering the traceback, which cannot be done
+    once the record has left its thread. The record keeps its fields so the
+    listener can write them as JSON.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _parse_levels(value):
+    """Parse LOG_LEVELS ("logger:LEVEL,logger:LEVEL") into a dictionary."""
+    levels = {}
+    for item in (value or '').split(','):
+        name, _, level = item.strip().rpartition(':')
+        if name and level:
+            levels[name] = level.upper()
+    return levels
+
+def configure_logging(app):
+    """
+    Send all logging through a queue to a background thread that writes it.
+
+    Request threads only put records on an in-memory queue; a listener
+    thread formats them and writes to logs/helpdesk.log (rotated at
+    LOG_MAX_BYTES) and to stderr. Records carry the ID of the request that
+    produced them, also returned in the X-Request-ID response header.
+
+    Args:
+        app: Flask application; the configuration is read from it
+    """
+    global _listener
+
+    formatter = JsonFormatter() if app.config['LOG_FORMAT'] == 'json' else logging.Formatter(
+        '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s [in %(module)s:%(lineno)d]'
+    )
+    handlers = []
+    logs_dir = os.path.join(app.config['BASE_DIR'], 'logs')
+    try:
+        os.makedirs(logs_dir, mode=0o775, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            os.path.join(logs_dir, 'helpdesk.log'),
+            maxBytes=app.config['LOG_MAX_BYTES'],
+            backupCount=app.config['LOG_BACKUP_COUNT'],
+            encoding='utf-8',
+        )
+        handlers.append(file_handler)
+    except OSError:
+        pass
+    handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _stop_listener()
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    queue_handler = _RequestQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _RequestQueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(app.config['LOG_LEVEL'].upper())
+
+    # app.logger propagates to the root logger instead of writing to stderr itself
+    app.logger.removeHandler(default_handler)
+    app.logger.setLevel(logging.NOTSET)
+    for name, level in _parse_levels(app.config['LOG_LEVELS']).items():
+        logging.getLogger(name).setLevel(level)
+
+    if len(handlers) == 1:
+        app.logger.warning("Could not configure file logging, logging to console only")
+
+    @app.before_request
+    def assign_request_id():
+        # Keep the ID set by a proxy in front of the app so both logs can be matched
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming if _REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+
+    @app.after_request
+    def return_request_id(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+# Write out whatever is still queued when the process exits
+atexit.register(_stop_listener)
@@ -0,0 +1,193 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, text
+from app import db
+from app.models.user import User
+from app.models.technician import Technician
+from app.models.category import TicketCategory
+from app.models.ticket import Ticket
+from app.utils.ticket_counters import fill_counters
+
+# Rows per executemany INSERT
+SEED_BATCH_SIZE = 20000
+
+TECHNICAL_PROFILES = ('soporte-tecnico', 'redes-e-infraestructura', 'mantenimiento')
+
+# Departments and how many of the users work in each
+DEPARTMENTS = {
+    'Administración': 18, 'Biblioteca': 6, 'Biología': 12, 'Física': 8, 'Química': 7,
+    'Matemática': 7, 'Educación': 10, 'Lenguas Extranjeras': 6, 'Turismo': 8,
+    'Ingeniería': 9, 'Enfermería': 5, 'Secretaría Académica': 4,
+}
+
+PRIORITY_WEIGHTS = {'baja': 40, 'media': 35, 'alta': 20, 'maxima': 5}
+
+PROBLEMS = [
+    'La impresora del {place} no imprime', 'No hay conexión a internet en {place}',
+    'La computadora de {place} no enciende', 'Falta tóner en la impresora de {place}',
+    'El proyector de {place} no detecta la notebook', 'No puedo acceder al correo institucional',
+    'Solicito instalación de software en {place}', 'El sitio web del departamento no carga',
+    'Se cortó la red wifi en {place}', 'El escáner de {place} no responde',
+    'Pantalla azul al iniciar en {place}', 'Necesito una cuenta nueva para {place}',
+]
+PLACES = ['el aula 3', 'la oficina 12', 'el laboratorio de química', 'la biblioteca', 'el aula magna',
+          'la secretaría', 'el box 4', 'la sala de profesores', 'el laboratorio de física', 'mesa de entradas']
+SOLUTIONS = ['Se reemplazó el cable de red.', 'Se reinstaló el controlador.', 'Se cambió el tóner.',
+             'Se reinició el equipo y se actualizó el sistema.', 'Se restableció la contraseña.',
+             'Se configuró el proyector.', 'Se reemplazó la fuente de alimentación.']
+
+def _batches(rows, size=SEED_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert(model, rows):
+    count = 0
+    for batch in _batches(rows):
+        db.session.execute(model.__table__.insert(), batch)
+        count += len(batch)
+    return count
+
+def _insert_tickets(rows):
+    """
+    Insert tickets with the per-row SQLite insert triggers suspended.
+
+    The search index and counter triggers would otherwise run once per row,
+    taking most of the load time. They are dropped inside the transaction,
+    the new tickets are indexed and counted with one statement each, and
+    the triggers are recreated from their stored SQL before committing.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return _insert(Ticket, rows)
+    conn = db.session.connection()
+    triggers = dict(conn.execute(text(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'trigger' AND tbl_name = 'tickets' AND name LIKE '%\\_ai' ESCAPE '\\'"
+    )).all())
+    last_id = conn.scalar(select(func.max(Ticket.id))) or 0
+    for name in triggers:
+        conn.execute(text(f'DROP TRIGGER "{name}"'))
+
+    count = _insert(Ticket, rows)
+
+    if 'tickets_fts_ai' in triggers:
+        conn.execute(text(
+            "INSERT INTO tickets_fts(rowid, description, solution) "
+            "SELECT id, description, solution FROM tickets WHERE id > :last_id"
+        ), {'last_id': last_id})
+    if 'ticket_counters_ai' in triggers:
+        fill_counters(conn)
+    for sql in triggers.values():
+        conn.execute(text(sql))
+    return count
+
+def _ticket_times(rng, now, days):
+    """Creation time, skewed towards recent days, and a status consistent with the ticket's age."""
+    age = timedelta(days=rng.triangular(0, days, 0))
+    created_at = now - age
+    # Most tickets are solved within days; the older a ticket, the likelier it is closed
+    service = timedelta(hours=rng.lognormvariate(2.5, 1.2))
+    if service < age:
+        return created_at, created_at + service, 'Cerrado'
+    status = 'En Proceso' if rng.random() < 0.35 else 'Abierto'
+    updated_at = created_at + (age * rng.random() if status == 'En Proceso' else timedelta())
+    return created_at, updated_at, status
+
+def seed_synthetic(users=0, technicians=0, categories=0, tickets=0, days=365, seed=None):
+    """
+    Bulk-insert synthetic users, technicians, categories and tickets.
+
+    Rows are generated lazily and written with one executemany INSERT per
+    SEED_BATCH_SIZE rows inside a single transaction. Tickets are spread over
+    the last `days` days, weighted towards recent ones, with status depending
+    on age and a skewed number of tickets per user. Tickets go to all users
+    and active technicians, existing ones included.
+
+    Args:
+        users, technicians, categories, tickets: Number of rows to create
+        days: Age of the oldest ticket
+        seed: Random seed, for reproducible data
+
+    Returns:
+        Dictionary with the number of rows inserted per table
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # Unique DNIs and emails even when seeding the same database several times
+    run = now.strftime('%y%m%d%H%M%S')
+    inserted = {}
+
+    departments = list(DEPARTMENTS)
+    department_weights = list(DEPARTMENTS.values())
+    inserted['users'] = _insert(User, ({
+        'dni': f'S{run}{i:07d}',
+        'apellido': f'Apellido{i}',
+        'nombre': f'Nombre{i}',
+        'email': f'sintetico.{run}.{i}@example.com',
+        'departamento': rng.choices(departments, department_weights)[0],
+        'role': 'user',
+    } for i in range(users)))
+
+    inserted['technicians'] = _insert(Technician, ({
+        'dni': f'T{run}{i:05d}',
+        'name': f'Técnico {i}',
+        'email': f'tecnico.{run}.{i}@example.com',
+        'technical_profile': TECHNICAL_PROFILES[i % len(TECHNICAL_PROFILES)],
+        'active': True,
+    } for i in range(technicians)))
+
+    inserted['categories'] = _insert(TicketCategory, ({
+        'name': f'Categoría {run}-{i}',
+        'technical_profile': TECHNICAL_PROFILES[i % len(TECHNICAL_PROFILES)],
+        'description': 'Categoría generada para pruebas de carga',
+        'active': True,
+    } for i in range(categories)))
+
+    if tickets:
+        user_ids = db.session.scalars(select(User.id).where(User.role == 'user')).all()
+        category_rows = db.session.execute(select(TicketCategory.id, TicketCategory.technical_profile)).all()
+        by_profile = {}
+        for tech_id, profile in db.session.execute(
+                select(Technician.id, Technician.technical_profile).where(Technician.active.is_(True))):
+            by_profile.setdefault(profile, []).append(tech_id)
+        if not user_ids or not category_rows:
+            raise ValueError('Se necesitan usuarios y categorías para generar tickets.')
+        # A few users open most of the tickets
+        user_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(user_ids))]
+        priorities = list(PRIORITY_WEIGHTS)
+        priority_weights = list(PRIORITY_WEIGHTS.values())
+
+        def ticket_rows():
+            for user_id in rng.choices(user_ids, user_weights, k=tickets):
+                category_id, profile = rng.choice(category_rows)
+                created_at, updated_at, status = _ticket_times(rng, now, days)
+                candidates = by_profile.get(profile)
+                technician_id = rng.choice(candidates) if candidates else None
+                yield {
+                    'description': rng.choice(PROBLEMS).format(place=rng.choice(PLACES)),
+                    'status': status,
+                    'priority': rng.choices(priorities, priority_weights)[0],
+                    'user_id': user_id,
+                    'technician_id': technician_id,
+                    'category_id': category_id,
+                    'profile': profile,
+                    'solution': rng.choice(SOLUTIONS) if status == 'Cerrado' else None,
+                    'created_at': created_at,
+                    'updated_at': updated_at,
+                }
+        inserted['tickets'] = _insert_tickets(ticket_rows())
+
+    db.session.commit()
+    return inserted
+
+def table_sizes():
+    """Number of rows in the main tables, recorded with benchmark results."""
+    return {
+        model.__tablename__: db.session.scalar(select(func.count()).select_from(model))
+        for model in (User, Technician, TicketCategory, Ticket)
+    }
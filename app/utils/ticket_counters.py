@@ -0,0 +1,126 @@
+from sqlalchemy import text, func
+from app import db
+from app.models.ticket import Ticket
+from app.models.ticket_counter import TicketCounter
+
+# Columns that make up a counter key, in table order
+COUNTER_KEY = ('status', 'technician_id', 'category_id', 'profile')
+
+def _increment(row, delta):
+    """Trigger statements adding delta to the counter of the old/new row."""
+    match = ' AND '.join(f'{column} IS {row}.{column}' for column in COUNTER_KEY)
+    values = ', '.join(f'{row}.{column}' for column in COUNTER_KEY)
+    return (
+        f"UPDATE ticket_counters SET count = count + ({delta}) WHERE {match};\n"
+        f"        INSERT INTO ticket_counters ({', '.join(COUNTER_KEY)}, count)\n"
+        f"        SELECT {values}, {delta} WHERE changes() = 0;"
+    )
+
+# Triggers keeping ticket_counters in step with every write to tickets,
+# including bulk UPDATE/DELETE statements that bypass the ORM.
+COUNTER_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_counters_ai AFTER INSERT ON tickets BEGIN
+        {_increment('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_counters_ad AFTER DELETE ON tickets BEGIN
+        {_increment('old', -1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_counters_au AFTER UPDATE OF {', '.join(COUNTER_KEY)} ON tickets
+    WHEN {' OR '.join(f'old.{column} IS NOT new.{column}' for column in COUNTER_KEY)} BEGIN
+        {_increment('old', -1)}
+        {_increment('new', 1)}
+    END""",
+]
+
+# Whether the counter triggers exist, per database URL
+_available = {}
+
+def _triggers_exist(conn):
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'ticket_counters_%'"
+    )).scalar() == len(COUNTER_TRIGGERS)
+
+def ensure_ticket_counters():
+    """
+    Create the counter triggers if they do not exist yet.
+
+    When the triggers are new the counters are filled from the existing
+    tickets. Only SQLite is supported; on other databases the dashboards
+    count the tickets table directly.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    with db.engine.begin() as conn:
+        exists = _triggers_exist(conn)
+        for statement in COUNTER_TRIGGERS:
+            conn.execute(text(statement))
+        if not exists:
+            fill_counters(conn)
+    _available[str(db.engine.url)] = True
+    return True
+
+def counters_available():
+    """True if ticket_counters is kept up to date by triggers."""
+    key = str(db.engine.url)
+    if key not in _available:
+        if db.engine.dialect.name != 'sqlite':
+            _available[key] = False
+        else:
+            with db.engine.connect() as conn:
+                _available[key] = _triggers_exist(conn)
+    return _available[key]
+
+def status_totals():
+    """
+    Number of tickets per status.
+
+    Returns:
+        Dictionary status -> count, or None if counters are not available
+    """
+    if not counters_available():
+        return None
+    rows = db.session.query(TicketCounter.status, func.sum(TicketCounter.count)).group_by(
+        TicketCounter.status).all()
+    return {status: int(total) for status, total in rows if total}
+
+def _actual_counts(conn):
+    columns = ', '.join(COUNTER_KEY)
+    rows = conn.execute(text(
+        f"SELECT {columns}, COUNT(*) FROM tickets GROUP BY {columns}")).all()
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+def _stored_counts(conn):
+    columns = ', '.join(COUNTER_KEY)
+    rows = conn.execute(text(
+        f"SELECT {columns}, SUM(count) FROM ticket_counters GROUP BY {columns}")).all()
+    return {tuple(row[:-1]): row[-1] for row in rows if row[-1]}
+
+def fill_counters(conn):
+    """Replace ticket_counters with fresh counts from the tickets table, on conn."""
+    columns = ', '.join(COUNTER_KEY)
+    conn.execute(text("DELETE FROM ticket_counters"))
+    conn.execute(text(
+        f"INSERT INTO ticket_counters ({columns}, count) "
+        f"SELECT {columns}, COUNT(*) FROM tickets GROUP BY {columns}"))
+
+def rebuild_counters(dry_run=False):
+    """
+    Recompute ticket_counters from the tickets table.
+
+    Args:
+        dry_run: Only compare, leave the counters untouched
+
+    Returns:
+        List of (key, stored, actual) tuples for every key that had drifted
+    """
+    with db.engine.begin() as conn:
+        actual = _actual_counts(conn)
+        stored = _stored_counts(conn)
+        drift = [
+            (key, stored.get(key, 0), actual.get(key, 0))
+            for key in sorted(set(actual) | set(stored), key=repr)
+            if stored.get(key, 0) != actual.get(key, 0)
+        ]
+        if not dry_run:
+            fill_counters(conn)
+    return drift
@@ -1,21 +1,264 @@
+import heapq
+import itertools
+import threading
 from random import choice
-from app.models.technician import Technician
+
+# Relative effort of an open ticket by priority, used by the priority-aware strategy
+PRIORITY_WEIGHTS = {'baja': 1, 'media': 2, 'alta': 3, 'maxima': 4}
+
+class _ProfileHeap:
+    """
+    Min-heap of technicians of one profile keyed by a workload value.
+
+    Keys change as tickets open and close; instead of re-heapifying, a new
+    entry is pushed and entries whose key is no longer current are skipped
+    when they reach the top. Picking and updating are O(log n).
+    """
+
+    def __init__(self, keys):
+        self._keys = dict(keys)
+        self._order = itertools.count()  # equal keys are served in insertion order
+        self._heap = [(key, next(self._order), tech_id) for tech_id, key in self._keys.items()]
+        heapq.heapify(self._heap)
+
+    def key(self, tech_id):
+        return self._keys[tech_id]
+
+    def update(self, tech_id, key):
+        self._keys[tech_id] = key
+        heapq.heappush(self._heap, (key, next(self._order), tech_id))
+        # Drop stale entries once they make up most of the heap
+        if len(self._heap) > 4 * len(self._keys) + 16:
+            self._heap = [(k, next(self._order), t) for t, k in self._keys.items()]
+            heapq.heapify(self._heap)
+
+    def peek(self):
+        while self._heap:
+            key, _, tech_id = self._heap[0]
+            if self._keys.get(tech_id) == key:
+                return tech_id
+            heapq.heappop(self._heap)
+        return None
+
+class AssignmentStrategy:
+    """
+    Chooses the technician for a new ticket among those of its profile.
+
+    Strategies keep their own view of each technician's open workload and are
+    told about every assignment, closure and reopening, so choosing never
+    needs a COUNT query. The initial workload is a dictionary
+    technician id -> {priority: number of open tickets}.
+    """
+    name = None
+
+    def __init__(self, technicians_by_profile, workload=None):
+        self.technicians_by_profile = technicians_by_profile
+        self._technicians = {t['id']: t for techs in technicians_by_profile.values() for t in techs}
+        self._lock = threading.Lock()
+        self.open_tickets = {}
+        for tech_id in self._technicians:
+            self.open_tickets[tech_id] = dict((workload or {}).get(tech_id, {}))
+
+    def _pick(self, profile, priority):
+        raise NotImplementedError
+
+    def _assigned(self, tech_id):
+        """Called when a new ticket is assigned to tech_id."""
+
+    def _changed(self, tech_id):
+        """Called after the workload of a technician changed."""
+
+    def pick(self, profile, priority=None):
+        """
+        Choose a technician and count the new ticket against them.
+
+        Returns:
+            Technician entry, or None if the profile has no technicians
+        """
+        with self._lock:
+            tech_id = self._pick(profile, priority)
+            if tech_id is None:
+                return None
+            self._assigned(tech_id)
+            self._add(tech_id, priority, 1)
+            self._changed(tech_id)
+            return self._technicians[tech_id]
+
+    def _add(self, tech_id, priority, delta):
+        counts = self.open_tickets.get(tech_id)
+        if counts is None:
+            return False
+        priority = priority or 'baja'
+        counts[priority] = max(counts.get(priority, 0) + delta, 0)
+        return True
+
+    def ticket_opened(self, tech_id, priority=None):
+        """A ticket assigned to tech_id was reopened."""
+        with self._lock:
+            if self._add(tech_id, priority, 1):
+                self._changed(tech_id)
+
+    def ticket_closed(self, tech_id, priority=None):
+        """A ticket assigned to tech_id was closed or deleted."""
+        with self._lock:
+            if self._add(tech_id, priority, -1):
+                self._changed(tech_id)
+
+class RandomStrategy(AssignmentStrategy):
+    """Any technician of the profile, chosen at random (the original behaviour)."""
+    name = 'random'
+
+    def _pick(self, profile, priority):
+        technicians = self.technicians_by_profile.get(profile)
+        return choice(technicians)['id'] if technicians else None
+
+class _HeapStrategy(AssignmentStrategy):
+    """Strategy picking the technician with the smallest key in a per-profile heap."""
+
+    def __init__(self, technicians_by_profile, workload=None):
+        super().__init__(technicians_by_profile, workload)
+        self._heaps = {
+            profile: _ProfileHeap({t['id']: self._key(t['id']) for t in techs})
+            for profile, techs in technicians_by_profile.items()
+        }
+        self._profile_of = {t['id']: profile for profile, techs in technicians_by_profile.items() for t in techs}
+
+    def _key(self, tech_id):
+        raise NotImplementedError
+
+    def _pick(self, profile, priority):
+        heap = self._heaps.get(profile)
+        return heap.peek() if heap else None
+
+    def _changed(self, tech_id):
+        heap = self._heaps.get(self._profile_of.get(tech_id))
+        if heap is not None:
+            heap.update(tech_id, self._key(tech_id))
+
+class LeastOpenStrategy(_HeapStrategy):
+    """The technician with the fewest open tickets."""
+    name = 'least_open'
+
+    def _key(self, tech_id):
+        return sum(self.open_tickets[tech_id].values())
+
+class PriorityAwareStrategy(_HeapStrategy):
+    """The technician with the least open work, weighting each ticket by its priority."""
+    name = 'priority_aware'
+
+    def _key(self, tech_id):
+        return sum(PRIORITY_WEIGHTS.get(priority, 1) * count
+                   for priority, count in self.open_tickets[tech_id].items())
+
+class WeightedRoundRobinStrategy(_HeapStrategy):
+    """
+    Technicians take turns, each receiving tickets in proportion to its weight.
+
+    Every technician has a virtual time that advances by 1/weight with each
+    assignment; the one with the earliest virtual time is next. Closing
+    tickets does not affect the rotation.
+
+    virtual_time carries the rotation over from the strategy this one
+    replaces, so reloading the technicians does not restart it. Technicians
+    not in it start at the earliest virtual time of their profile, taking
+    their turn next without catching up on tickets handed out before.
+    """
+    name = 'weighted_round_robin'
+
+    def __init__(self, technicians_by_profile, workload=None, weights=None, virtual_time=None):
+        self.weights = weights or {}
+        self._virtual_time = {}
+        previous = virtual_time or {}
+        for techs in technicians_by_profile.values():
+            known = [previous[t['id']] for t in techs if t['id'] in previous]
+            start = min(known) if known else 0.0
+            for t in techs:
+                self._virtual_time[t['id']] = previous.get(t['id'], start)
+        super().__init__(technicians_by_profile, workload)
+
+    def virtual_times(self):
+        """Copy of each technician's virtual time, to hand over to a replacement strategy."""
+        with self._lock:
+            return dict(self._virtual_time)
+
+    def _weight(self, tech_id):
+        technician = self._technicians[tech_id]
+        weight = self.weights.get(technician.get('email'), 1)
+        return max(float(weight), 0.01)
+
+    def _key(self, tech_id):
+        return self._virtual_time.get(tech_id, 0.0)
+
+    def _assigned(self, tech_id):
+        self._virtual_time[tech_id] = self._key(tech_id) + 1 / self._weight(tech_id)
+
+    def _changed(self, tech_id):
+        # Only assignments move a technician in the rotation
+        if self._virtual_time.get(tech_id) != self._heaps[self._profile_of[tech_id]].key(tech_id):
+            super()._changed(tech_id)
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (RandomStrategy, LeastOpenStrategy, WeightedRoundRobinStrategy, PriorityAwareStrategy)
+}
+
+def parse_weights(value):
+    """Parse ASSIGNMENT_WEIGHTS ("email:weight,email:weight") into a dictionary."""
+    weights = {}
+    for item in (value or '').split(','):
+        email, _, weight = item.strip().rpartition(':')
+        if email:
+            try:
+                weights[email] = float(weight)
+            except ValueError:
+                pass
+    return weights
+
+def create_strategy(name, technicians_by_profile, workload=None, weights=None, previous=None):
+    """
+    Build the assignment strategy called name.
+
+    previous is the strategy being replaced, if any; the weighted round robin
+    continues its rotation instead of starting over.
+
+    Raises:
+        ValueError: If there is no strategy with that name
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown assignment strategy '{name}', expected one of {', '.join(STRATEGIES)}")
+    if name == WeightedRoundRobinStrategy.name:
+        virtual_time = previous.virtual_times() if isinstance(previous, WeightedRoundRobinStrategy) else None
+        return WeightedRoundRobinStrategy(technicians_by_profile, workload, weights, virtual_time)
+    return STRATEGIES[name](technicians_by_profile, workload)
 
 class TicketDistributor:
-    def __init__(self, technicians):
-        self.technicians = technicians
+    def __init__(self, technicians, strategy=None):
+        # Technicians grouped by profile, as returned by the registry; a flat
+        # list from get_technician_list is grouped here
+        if isinstance(technicians, dict):
+            self.technicians_by_profile = technicians
+        else:
+            self.technicians_by_profile = {}
+            for tech in technicians:
+                self.technicians_by_profile.setdefault(tech['profile'], []).append(tech)
+        self.strategy = strategy or RandomStrategy(self.technicians_by_profile)
 
     def distribute_ticket(self, ticket):
         profile = ticket.get('profile', 'soporte-tecnico')  # Default to 'soporte-tecnico'
-        available_technicians = [tech for tech in self.technicians if tech['profile'] == profile]
+        return self.strategy.pick(profile, ticket.get('priority'))
 
-        if available_technicians:
-            assigned_technician = choice(available_technicians)
-            return assigned_technician
-        else:
-            return None
+    def ticket_opened(self, technician_id, priority=None):
+        """Count a reopened ticket against its technician."""
+        if technician_id:
+            self.strategy.ticket_opened(technician_id, priority)
+
+    def ticket_closed(self, technician_id, priority=None):
+        """Release a closed or deleted ticket from its technician's workload."""
+        if technician_id:
+            self.strategy.ticket_closed(technician_id, priority)
 
 # Helper function to get a list of technicians in the format the distributor expects
 def get_technician_list():
+    from app.models.technician import Technician
     technicians = Technician.query.all()
-    return [{'id': t.id, 'name': t.name, 'profile': t.technical_profile} for t in technicians]
\ No newline at end of file
+    return [{'id': t.id, 'name': t.name, 'profile': t.technical_profile} for t in technicians]
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from sqlalchemy import select
+from app import db
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.models.technician import Technician
+from app.models.category import TicketCategory
+from app.utils.ticket_filters import apply_ticket_filters
+
+# Output column name and the selected expression it comes from
+EXPORT_COLUMNS = [
+    ('id', Ticket.id),
+    ('created_at', Ticket.created_at),
+    ('updated_at', Ticket.updated_at),
+    ('status', Ticket.status),
+    ('priority', Ticket.priority),
+    ('profile', Ticket.profile),
+    ('category', TicketCategory.name),
+    ('description', Ticket.description),
+    ('solution', Ticket.solution),
+    ('user_dni', User.dni),
+    ('user_name', User.nombre),
+    ('user_surname', User.apellido),
+    ('user_email', User.email),
+    ('department', User.departamento),
+    ('technician_name', Technician.name),
+    ('technician_email', Technician.email),
+]
+
+# Rows fetched from the database cursor at a time
+EXPORT_BATCH_SIZE = 500
+
+def export_rows(filters):
+    """
+    Yield the tickets matching the dashboard filters as tuples, oldest first.
+
+    Rows are plain column tuples read in batches from the database cursor,
+    so memory use does not grow with the number of tickets.
+    """
+    stmt = select(*(column for _, column in EXPORT_COLUMNS)).select_from(Ticket).outerjoin(
+        User, Ticket.user_id == User.id
+    ).outerjoin(
+        Technician, Ticket.technician_id == Technician.id
+    ).outerjoin(
+        TicketCategory, Ticket.category_id == TicketCategory.id
+    ).order_by(Ticket.created_at, Ticket.id)
+    stmt = apply_ticket_filters(stmt, filters).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    yield from db.session.execute(stmt)
+
+def _value(value):
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def iter_csv(rows):
+    """Encode rows as CSV, yielding the header first and then one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(name for name, _ in EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for count, row in enumerate(rows, 1):
+        writer.writerow('' if value is None else _value(value) for value in row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_ndjson(rows):
+    """Encode rows as newline-delimited JSON objects, one chunk per batch."""
+    names = [name for name, _ in EXPORT_COLUMNS]
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(names, map(_value, row))), ensure_ascii=False))
+        if len(chunk) == EXPORT_BATCH_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.utils.ticket_search import search_available, matching_ticket_ids
+
+# Query parameters understood by the dashboards, in the order they appear in the UI
+FILTER_PARAMS = ('search', 'status', 'priority', 'department', 'technician', 'date')
+
+def get_ticket_filters(args):
+    """Return the non-empty dashboard filters present in the request arguments."""
+    filters = {}
+    for name in FILTER_PARAMS:
+        value = (args.get(name) or '').strip()
+        if value:
+            filters[name] = value
+    return filters
+
+def _date_threshold(range_name):
+    """Start of the 'today', 'week' or 'month' range, matching the dashboard date filter."""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    if range_name == 'today':
+        return today
+    if range_name == 'week':
+        return today - timedelta(days=7)
+    if range_name == 'month':
+        return today - timedelta(days=30)
+    return None
+
+def apply_ticket_filters(query, filters):
+    """
+    Apply dashboard filters to a Ticket query in SQL.
+
+    Args:
+        query: Ticket query to narrow down
+        filters: Dictionary returned by get_ticket_filters
+
+    Returns:
+        The filtered query
+    """
+    if 'status' in filters:
+        query = query.filter(Ticket.status == filters['status'])
+    if 'priority' in filters:
+        query = query.filter(Ticket.priority == filters['priority'])
+    if 'technician' in filters:
+        try:
+            query = query.filter(Ticket.technician_id == int(filters['technician']))
+        except ValueError:
+            pass
+    if 'department' in filters:
+        department_users = select(User.id).where(User.departamento == filters['department'])
+        query = query.filter(Ticket.user_id.in_(department_users))
+    if 'date' in filters:
+        threshold = _date_threshold(filters['date'])
+        if threshold:
+            query = query.filter(Ticket.created_at >= threshold)
+    if 'search' in filters:
+        pattern = f"%{filters['search']}%"
+        matching_users = select(User.id).where(or_(
+            User.nombre.ilike(pattern),
+            User.apellido.ilike(pattern),
+            User.departamento.ilike(pattern)
+        ))
+        if search_available():
+            # Full-text index instead of a LIKE scan over every ticket
+            text_match = Ticket.id.in_(matching_ticket_ids(filters['search']))
+        else:
+            text_match = or_(Ticket.description.ilike(pattern), Ticket.solution.ilike(pattern))
+        query = query.filter(or_(text_match, Ticket.user_id.in_(matching_users)))
+    return query
@@ -0,0 +1,147 @@
+import re
+from markupsafe import escape
+from sqlalchemy import text, or_
+from app import db
+from app.models.ticket import Ticket
+
+# External-content FTS5 index over tickets.description and tickets.solution,
+# kept in sync by triggers so the ORM does not need to know about it.
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+        description, solution,
+        content='tickets', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, description, solution)
+        VALUES (new.id, new.description, new.solution);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, description, solution)
+        VALUES ('delete', old.id, old.description, old.solution);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE OF description, solution ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, description, solution)
+        VALUES ('delete', old.id, old.description, old.solution);
+        INSERT INTO tickets_fts(rowid, description, solution)
+        VALUES (new.id, new.description, new.solution);
+    END""",
+]
+
+# Markers used in snippet() output; replaced by <mark> after HTML-escaping the text
+_HIGHLIGHT_START = '\x02'
+_HIGHLIGHT_END = '\x03'
+
+# Whether the FTS5 index exists, per database URL
+_available = {}
+
+def ensure_search_index():
+    """
+    Create the FTS5 index and its triggers if they do not exist yet.
+
+    A newly created index is filled from the existing tickets. Only SQLite is
+    supported; on other databases search falls back to LIKE.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    with db.engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+        )).first()
+        for statement in FTS_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')"))
+    _available[str(db.engine.url)] = True
+    return True
+
+def search_available():
+    """True if the database has the FTS5 ticket index."""
+    key = str(db.engine.url)
+    if key not in _available:
+        if db.engine.dialect.name != 'sqlite':
+            _available[key] = False
+        else:
+            with db.engine.connect() as conn:
+                _available[key] = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+                )).first() is not None
+    return _available[key]
+
+def build_match_query(term):
+    """
+    Turn free text typed by a user into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix query and all words must match, so
+    FTS5 operators and punctuation in the input cannot cause syntax errors.
+    """
+    words = re.findall(r'\w+', term or '')
+    return ' '.join(f'"{word}"*' for word in words)
+
+def matching_ticket_ids(term):
+    """Subquery with the ids of the tickets whose description or solution match term."""
+    return text("SELECT rowid FROM tickets_fts WHERE tickets_fts MATCH :match").bindparams(
+        match=build_match_query(term)).columns(db.column('rowid'))
+
+def _highlight(snippet):
+    if snippet is None:
+        return None
+    return str(escape(snippet)).replace(_HIGHLIGHT_START, '<mark>').replace(_HIGHLIGHT_END, '</mark>')
+
+def search_tickets(term, scope=None, limit=20):
+    """
+    Ranked full-text search over ticket descriptions and solutions.
+
+    Args:
+        term: Text typed by the user
+        scope: Optional SQLAlchemy condition on Ticket restricting visible tickets
+        limit: Maximum number of results
+
+    Returns:
+        List of dictionaries with the ticket fields and HTML-safe snippets
+        where matches are wrapped in <mark>
+    """
+    match = build_match_query(term)
+    if not match:
+        return []
+
+    if not search_available():
+        # Without FTS5 fall back to an unranked substring search
+        pattern = f"%{term}%"
+        query = Ticket.query.filter(or_(Ticket.description.ilike(pattern), Ticket.solution.ilike(pattern)))
+        if scope is not None:
+            query = query.filter(scope)
+        return [{
+            'id': ticket.id,
+            'status': ticket.status,
+            'priority': ticket.priority,
+            'created_at': ticket.created_at,
+            'description': str(escape(ticket.description)),
+            'solution': str(escape(ticket.solution)) if ticket.solution else None,
+            'rank': None
+        } for ticket in query.order_by(Ticket.created_at.desc()).limit(limit)]
+
+    fts = db.table('tickets_fts', db.column('rowid'))
+    rank = db.func.bm25(db.literal_column('tickets_fts')).label('rank')
+    description = db.func.snippet(db.literal_column('tickets_fts'), 0, _HIGHLIGHT_START, _HIGHLIGHT_END, '…', 12)
+    solution = db.func.snippet(db.literal_column('tickets_fts'), 1, _HIGHLIGHT_START, _HIGHLIGHT_END, '…', 12)
+
+    query = db.session.query(
+        Ticket.id, Ticket.status, Ticket.priority, Ticket.created_at,
+        Ticket.solution.isnot(None).label('has_solution'),
+        description.label('description'), solution.label('solution_snippet'), rank
+    ).join(fts, fts.c.rowid == Ticket.id).filter(
+        text("tickets_fts MATCH :match").bindparams(match=match)
+    )
+    if scope is not None:
+        query = query.filter(scope)
+
+    return [{
+        'id': row.id,
+        'status': row.status,
+        'priority': row.priority,
+        'created_at': row.created_at,
+        'description': _highlight(row.description),
+        'solution': _highlight(row.solution_snippet) if row.has_solution else None,
+        'rank': row.rank
+    } for row in query.order_by(rank).limit(limit)]
@@ -0,0 +1,89 @@
+import random
+import time
+from functools import wraps
+from flask import current_app, session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app import db
+
+# sqlite3 error messages of locks another connection holds; anything else is a real error
+_BUSY_MESSAGES = ('database is locked', 'database is busy', 'database table is locked')
+
+def is_database_busy(error):
+    """True if the error is SQLite giving up on a lock held by another connection."""
+    return isinstance(error, OperationalError) and any(
+        message in str(error.orig) for message in _BUSY_MESSAGES)
+
+def after_commit(callback):
+    """
+    Run callback once the current transaction commits.
+
+    For side effects that must not happen if the changes are not saved,
+    like sending an email or updating in-memory state. Dropped if the
+    transaction rolls back.
+    """
+    _listen()
+    db.session.info.setdefault('after_commit', []).append(callback)
+
+def after_rollback(callback):
+    """Run callback if the current transaction rolls back, to undo in-memory changes made for it."""
+    _listen()
+    db.session.info.setdefault('after_rollback', []).append(callback)
+
+def _run(sess, key):
+    callbacks = sess.info.pop(key, [])
+    sess.info.pop('after_rollback' if key == 'after_commit' else 'after_commit', None)
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            current_app.logger.exception(f"Error in {key.replace('_', ' ')} callback")
+
+def _after_commit(sess):
+    _run(sess, 'after_commit')
+
+def _after_rollback(sess):
+    _run(sess, 'after_rollback')
+
+_listening = False
+
+def _listen():
+    global _listening
+    if not _listening:
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+        _listening = True
+
+def retry_on_busy(view):
+    """
+    Run the view again when SQLite reports the database locked.
+
+    busy_timeout already makes each statement wait for the lock; this covers
+    bursts that outlast it. The view runs as one unit of work: on a busy
+    error its transaction is rolled back, messages it flashed are discarded
+    and it is run again after a jittered, growing pause, up to
+    SQLITE_BUSY_RETRIES times. Side effects belong in after_commit so that
+    they happen once.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        retries = current_app.config.get('SQLITE_BUSY_RETRIES', 3)
+        base_delay = current_app.config.get('SQLITE_BUSY_BACKOFF', 0.05)
+        flashes = list(session.get('_flashes', []))
+        for attempt in range(retries + 1):
+            try:
+                return view(*args, **kwargs)
+            except OperationalError as e:
+                if not is_database_busy(e):
+                    raise
+                # Explicitly: a COMMIT that failed on a lock leaves the sqlite3
+                # transaction open, and closing the session does not end it
+                db.session.rollback()
+                if attempt == retries:
+                    raise
+                session['_flashes'] = list(flashes)
+                delay = random.uniform(0, min(1.0, base_delay * (2 ** attempt)))
+                current_app.logger.warning(
+                    f"Database locked in {view.__name__}, retrying in {delay * 1000:.0f} ms (attempt {attempt + 1})")
+                time.sleep(delay)
+    return wrapper
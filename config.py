@@ -24,16 +24,8 @@ if os.path.exists(env_file):
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your_default_secret_key')
     
-    # Make sure the instance directory exists with proper permissions
-    instance_dir = os.path.join(base_dir, 'instance')
-    if not os.path.exists(instance_dir):
-        try:
-            if IS_WINDOWS:
-                os.makedirs(instance_dir)
-            else:
-                os.makedirs(instance_dir, mode=0o775)
-        except:
-            pass  # Will be handled later if this fails
+    # The instance/ and logs/ directories are created by `flask init-db`
+    BASE_DIR = base_dir
     
     # Use absolute path for SQLite database
     db_path = os.path.join(base_dir, 'instance', 'site.db')
@@ -61,8 +53,69 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = db_uri
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # PRAGMAs set on every SQLite connection: 'production' (WAL, busy timeout,
+    # synchronous=NORMAL, mmap and cache sizes) or 'default' (SQLite's own).
+    # SQLITE_PRAGMAS overrides single ones, e.g. "busy_timeout=10000,mmap_size=0".
+    # `flask sqlite-maintenance` (and the email worker every
+    # SQLITE_MAINTENANCE_INTERVAL seconds) runs PRAGMA optimize and a WAL checkpoint
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+    SQLITE_PRAGMAS = os.environ.get('SQLITE_PRAGMAS', '')
+    SQLITE_MAINTENANCE_INTERVAL = float(os.environ.get('SQLITE_MAINTENANCE_INTERVAL', 3600))
+    # Write views are run again when the database stays locked past busy_timeout:
+    # up to SQLITE_BUSY_RETRIES times, after jittered pauses growing from SQLITE_BUSY_BACKOFF seconds
+    SQLITE_BUSY_RETRIES = int(os.environ.get('SQLITE_BUSY_RETRIES', 3))
+    SQLITE_BUSY_BACKOFF = float(os.environ.get('SQLITE_BUSY_BACKOFF', 0.05))
     GAS_DEPLOYMENT_URL = os.environ.get('GAS_DEPLOYMENT_URL')
     ADMIN_NAME = os.environ.get('ADMIN_NAME')
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL')
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD')
-    GOOGLE_DRIVE_SECURE_TOKEN = os.environ.get('GOOGLE_DRIVE_SECURE_TOKEN')
\ No newline at end of file
+    GOOGLE_DRIVE_SECURE_TOKEN = os.environ.get('GOOGLE_DRIVE_SECURE_TOKEN')
+    
+    # Email outbox: request handlers queue emails and `flask email-worker` sends them
+    EMAIL_OUTBOX_ENABLED = os.environ.get('EMAIL_OUTBOX_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    EMAIL_WORKER_BATCH_SIZE = int(os.environ.get('EMAIL_WORKER_BATCH_SIZE', 20))
+    EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 25))  # calls per GAS request
+    EMAIL_WORKER_POLL_INTERVAL = float(os.environ.get('EMAIL_WORKER_POLL_INTERVAL', 5))
+    EMAIL_WORKER_LEASE = int(os.environ.get('EMAIL_WORKER_LEASE', 300))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 8))
+    EMAIL_RETRY_BASE_DELAY = int(os.environ.get('EMAIL_RETRY_BASE_DELAY', 30))
+    EMAIL_RETRY_MAX_DELAY = int(os.environ.get('EMAIL_RETRY_MAX_DELAY', 3600))
+    
+    # HTTP transport to the Google Apps Script web app
+    GAS_CONNECT_TIMEOUT = float(os.environ.get('GAS_CONNECT_TIMEOUT', 5))
+    GAS_READ_TIMEOUT = float(os.environ.get('GAS_READ_TIMEOUT', 30))
+    GAS_MAX_RETRIES = int(os.environ.get('GAS_MAX_RETRIES', 2))
+    GAS_RETRY_BACKOFF = float(os.environ.get('GAS_RETRY_BACKOFF', 0.5))
+    GAS_RETRY_BACKOFF_MAX = float(os.environ.get('GAS_RETRY_BACKOFF_MAX', 8))
+    GAS_POOL_SIZE = int(os.environ.get('GAS_POOL_SIZE', 10))
+    GAS_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('GAS_CIRCUIT_FAILURE_THRESHOLD', 5))
+    GAS_CIRCUIT_RESET_TIMEOUT = float(os.environ.get('GAS_CIRCUIT_RESET_TIMEOUT', 60))
+    
+    # Ticket lists use cursor pagination; counting every matching row for the
+    # "Mostrando X de Y" line is only done when this is enabled
+    PAGINATION_EXACT_TOTALS = os.environ.get('PAGINATION_EXACT_TOTALS', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Seconds the in-process technician/category registry is trusted before reloading
+    REGISTRY_TTL = float(os.environ.get('REGISTRY_TTL', 60))
+    
+    # How new tickets are assigned: least_open, priority_aware, weighted_round_robin or random.
+    # ASSIGNMENT_WEIGHTS ("email:weight,...") sets technician shares for weighted_round_robin
+    ASSIGNMENT_STRATEGY = os.environ.get('ASSIGNMENT_STRATEGY', 'least_open')
+    ASSIGNMENT_WEIGHTS = os.environ.get('ASSIGNMENT_WEIGHTS', '')
+    
+    # bcrypt work factor for new password hashes; existing hashes with another
+    # cost are rehashed at their next login. `flask benchmark-bcrypt` shows what each costs
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    
+    # Logging goes through a queue to a background thread. LOG_LEVELS sets
+    # individual loggers, e.g. "sqlalchemy.engine:INFO,werkzeug:WARNING"
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')  # 'json' or 'text'
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', 5))
+    
+    # /admin/metrics is open to admins; a scraper can instead send this token
+    # as "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
@@ -2,46 +2,125 @@ from app import create_app, db
 from app.models.technician import Technician
 from app.models.ticket import Ticket
 from app.utils.email_service import EmailService
-from datetime import datetime, timedelta
-import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, time as dtime
+from sqlalchemy import func, case
+import argparse
+import json
+import os
+import threading
+import time
 
-def send_daily_summaries():
+def load_checkpoint(path):
+    """Return the ids of technicians already notified by a previous run of the same day."""
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f).get('sent', []))
+
+def save_checkpoint(path, sent):
+    """Atomically write the checkpoint so a crash never leaves a truncated file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'sent': sorted(sent)}, f)
+    os.replace(tmp_path, path)
+
+def get_summaries(today_start):
+    """Build every active technician's summary with a single aggregate query."""
+    rows = db.session.query(
+        Technician.id,
+        Technician.name,
+        Technician.email,
+        func.count(case((Ticket.status != 'Cerrado', 1))),
+        func.count(case(((Ticket.status == 'Cerrado') & (Ticket.updated_at >= today_start), 1)))
+    ).outerjoin(
+        Ticket, Ticket.technician_id == Technician.id
+    ).filter(
+        Technician.active.is_(True)
+    ).group_by(Technician.id).all()
+
+    return [{
+        'id': tech_id,
+        'name': name,
+        'email': email,
+        'open_tickets': open_tickets,
+        'closed_today': closed_today
+    } for tech_id, name, email, open_tickets, closed_today in rows]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def send_daily_summaries(workers=4, batch_size=None, checkpoint_path=None):
     """Send daily summary emails to all technicians."""
     app = create_app()
     with app.app_context():
-        # Get all technicians
-        technicians = Technician.query.all()
-        today = datetime.now().date()
-        
-        for technician in technicians:
-            # Count open tickets assigned to this technician
-            open_tickets = Ticket.query.filter_by(
-                technician_id=technician.id
-            ).filter(
-                Ticket.status != 'Closed'
-            ).count()
-            
-            # Count tickets closed today by this technician
-            closed_today = Ticket.query.filter_by(
-                technician_id=technician.id,
-                status='Closed'
-            ).filter(
-                Ticket.updated_at >= today
-            ).count()
-            
-            # Send the summary email
-            email_service = EmailService()
-            result = email_service.send_technician_daily_summary(
-                technician.email,
-                technician.name,
-                open_tickets,
-                closed_today
-            )
-            
-            if not result["success"]:
-                print(f"Failed to send summary to {technician.name}: {result['message']}")
-            else:
-                print(f"Successfully sent summary to {technician.name}")
+        today = datetime.utcnow().date()
+        today_start = datetime.combine(today, dtime.min)
+        batch_size = batch_size or app.config.get('EMAIL_BATCH_SIZE', 25)
+        checkpoint_path = checkpoint_path or os.path.join(
+            app.instance_path, f"daily_summary_{today.isoformat()}.json")
+
+        query_started = time.perf_counter()
+        summaries = get_summaries(today_start)
+        query_time = time.perf_counter() - query_started
+
+        # Skip technicians already notified by a crashed run of today
+        sent = load_checkpoint(checkpoint_path)
+        pending = [summary for summary in summaries if summary['id'] not in sent]
+        if len(pending) < len(summaries):
+            print(f"Resuming: {len(summaries) - len(pending)} summaries already sent today")
+
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        checkpoint_lock = threading.Lock()
+        send_times = []
+        failures = 0
+
+        def send_batch(batch):
+            with app.app_context():
+                email_service = EmailService(deferred=False)
+                started = time.perf_counter()
+                results = email_service.send_many([("sendTechnicianDailySummary", [
+                    summary['email'],
+                    summary['name'],
+                    summary['open_tickets'],
+                    summary['closed_today']
+                ]) for summary in batch], batch_size=len(batch))
+                return batch, results, time.perf_counter() - started
+
+        send_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(send_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                batch, results, elapsed = future.result()
+                send_times.append(elapsed)
+                with checkpoint_lock:
+                    for summary, result in zip(batch, results):
+                        if result["success"]:
+                            sent.add(summary['id'])
+                            print(f"Successfully sent summary to {summary['name']}")
+                        else:
+                            failures += 1
+                            print(f"Failed to send summary to {summary['name']}: {result['message']}")
+                    save_checkpoint(checkpoint_path, sent)
+        send_time = time.perf_counter() - send_started
+
+        print("--- Timing report ---")
+        print(f"Technicians: {len(summaries)} ({len(pending)} pending, {failures} failed)")
+        print(f"Query time: {query_time * 1000:.1f} ms")
+        print(f"Send time: {send_time * 1000:.1f} ms in {len(send_times)} requests")
+        print(f"Per send: p50 {percentile(send_times, 50) * 1000:.1f} ms, "
+              f"p95 {percentile(send_times, 95) * 1000:.1f} ms")
+        return failures
 
 if __name__ == '__main__':
-    send_daily_summaries()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Send the daily ticket summary to every technician.')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent requests to Apps Script')
+    parser.add_argument('--batch-size', type=int, default=None, help='Summaries per Apps Script request')
+    parser.add_argument('--checkpoint', default=None, help='Checkpoint file (default: instance/daily_summary_<date>.json)')
+    args = parser.parse_args()
+    failures = send_daily_summaries(args.workers, args.batch_size, args.checkpoint)
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,54 @@
+"""ticket counters maintained by triggers
+
+Revision ID: a93d5c2f7e18
+Revises: e25a0b8f9c41
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93d5c2f7e18'
+down_revision = 'e25a0b8f9c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ticket_counters',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('technician_id', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('profile', sa.String(length=50), nullable=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_ticket_counters_key', 'ticket_counters', ['status', 'technician_id', 'category_id', 'profile'], unique=False, if_not_exists=True)
+
+    # Triggers are SQLite only; other databases count the tickets table directly
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    from app.utils.ticket_counters import COUNTER_TRIGGERS, COUNTER_KEY
+    exists = op.get_bind().execute(sa.text(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'ticket_counters_%'"
+    )).scalar() == len(COUNTER_TRIGGERS)
+    for statement in COUNTER_TRIGGERS:
+        op.execute(statement)
+    if not exists:
+        columns = ', '.join(COUNTER_KEY)
+        op.execute("DELETE FROM ticket_counters")
+        op.execute(f"INSERT INTO ticket_counters ({columns}, count) "
+                   f"SELECT {columns}, COUNT(*) FROM tickets GROUP BY {columns}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS ticket_counters_au")
+        op.execute("DROP TRIGGER IF EXISTS ticket_counters_ad")
+        op.execute("DROP TRIGGER IF EXISTS ticket_counters_ai")
+    op.drop_index('ix_ticket_counters_key', table_name='ticket_counters')
+    op.drop_table('ticket_counters')
@@ -0,0 +1,39 @@
+"""full-text index over ticket descriptions and solutions
+
+Revision ID: c7d913a4e6f2
+Revises: 8b42e6f0c5d3
+Create Date: 2026-10-18 13:22:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d913a4e6f2'
+down_revision = '8b42e6f0c5d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite only; other databases fall back to LIKE searches
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    from app.utils.ticket_search import FTS_SCHEMA
+    exists = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+    )).first()
+    for statement in FTS_SCHEMA:
+        op.execute(statement)
+    if not exists:
+        op.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS tickets_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS tickets_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS tickets_fts_ai")
+    op.execute("DROP TABLE IF EXISTS tickets_fts")
@@ -0,0 +1,26 @@
+"""technician active flag
+
+Revision ID: d4e8b1c6a2f9
+Revises: a93d5c2f7e18
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8b1c6a2f9'
+down_revision = 'a93d5c2f7e18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('technicians', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+
+def downgrade():
+    with op.batch_alter_table('technicians', schema=None) as batch_op:
+        batch_op.drop_column('active')
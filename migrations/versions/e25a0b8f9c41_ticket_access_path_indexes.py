@@ -0,0 +1,38 @@
+"""composite indexes for the dashboard and list queries
+
+Revision ID: e25a0b8f9c41
+Revises: c7d913a4e6f2
+Create Date: 2026-10-18 13:23:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e25a0b8f9c41'
+down_revision = 'c7d913a4e6f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tickets_technician_status_created', 'tickets', ['technician_id', 'status', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_tickets_technician_status_updated', 'tickets', ['technician_id', 'status', 'updated_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_tickets_user_created', 'tickets', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_tickets_status_created', 'tickets', ['status', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_tickets_created_at', 'tickets', ['created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_users_departamento', 'users', ['departamento'], unique=False, if_not_exists=True)
+    op.drop_index('ix_email_outbox_status', table_name='email_outbox', if_exists=True)
+    op.create_index('ix_email_outbox_status_next_attempt', 'email_outbox', ['status', 'next_attempt_at'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_email_outbox_status_next_attempt', table_name='email_outbox')
+    op.create_index('ix_email_outbox_status', 'email_outbox', ['status'], unique=False)
+    op.drop_index('ix_users_departamento', table_name='users')
+    op.drop_index('ix_tickets_created_at', table_name='tickets')
+    op.drop_index('ix_tickets_status_created', table_name='tickets')
+    op.drop_index('ix_tickets_user_created', table_name='tickets')
+    op.drop_index('ix_tickets_technician_status_updated', table_name='tickets')
+    op.drop_index('ix_tickets_technician_status_created', table_name='tickets')
@@ -0,0 +1,54 @@
+"""ticket timestamps not null
+
+Revision ID: f3a6d8c1b4e7
+Revises: d4e8b1c6a2f9
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a6d8c1b4e7'
+down_revision = 'd4e8b1c6a2f9'
+branch_labels = None
+depends_on = None
+
+
+def _existing_triggers():
+    if op.get_bind().dialect.name != 'sqlite':
+        return set()
+    return {row[0] for row in op.get_bind().execute(sa.text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tickets'"))}
+
+
+def _restore_triggers(existing):
+    # SQLite batch mode rebuilds the tickets table, which drops its triggers
+    from app.utils.ticket_search import FTS_SCHEMA
+    from app.utils.ticket_counters import COUNTER_TRIGGERS
+    if any(name.startswith('tickets_fts_') for name in existing):
+        for statement in FTS_SCHEMA:
+            op.execute(statement)
+    if any(name.startswith('ticket_counters_') for name in existing):
+        for statement in COUNTER_TRIGGERS:
+            op.execute(statement)
+
+
+def _set_nullable(nullable):
+    existing = _existing_triggers()
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=nullable)
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=nullable)
+    _restore_triggers(existing)
+
+
+def upgrade():
+    # Keyset pagination sorts on these columns and cannot place NULLs
+    op.execute("UPDATE tickets SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    op.execute("UPDATE tickets SET updated_at = created_at WHERE updated_at IS NULL")
+    _set_nullable(False)
+
+
+def downgrade():
+    _set_nullable(True)